@@ -5,15 +5,59 @@
 """Broadlink device manager."""
 
 import binascii
-import time
-from typing import Optional, cast
+import functools
+from time import monotonic, sleep
+from typing import Callable, Optional, TypeVar, cast
 
 import click
 from broadlink import gendevice
 from broadlink.const import DEFAULT_PORT, DEFAULT_TIMEOUT
-from broadlink.exceptions import ReadError, StorageError
+from broadlink.exceptions import AuthorizationError, ConnectionClosedError, ReadError, StorageError
 from broadlink.remote import rmmini
 
+try:
+    import pybase64
+except ImportError:  # pragma: no cover
+    pybase64 = None  # type: ignore
+
+
+_POLL_MIN_INTERVAL = 0.02
+_POLL_MAX_INTERVAL = 0.5
+_POLL_BACKOFF_RATE = 1.5
+
+# errors raised by the device when the authenticated session is no longer valid
+_STALE_SESSION_ERRORS = (AuthorizationError, ConnectionClosedError)
+
+_T = TypeVar('_T')
+
+
+def _b64encode(data: bytes) -> str:
+    # pybase64 is an optional speedup, stdlib encoder gives the same output
+    if pybase64 is not None:
+        return pybase64.b64encode_as_string(data)
+    return binascii.b2a_base64(data, newline=False).decode('ascii')
+
+
+def _reauth_on_stale_session(method: Callable[..., _T]) -> Callable[..., _T]:
+    """Decorator that authenticates again, only once, when the device session is stale, then retries the call.
+
+    Arguments:
+        method: BroadlinkManager method that sends a command to the device
+
+    Returns:
+        wrapped method
+    """
+
+    @functools.wraps(method)
+    def _wrapper(self: 'BroadlinkManager', *args, **kwargs) -> _T:
+        try:
+            return method(self, *args, **kwargs)
+        except _STALE_SESSION_ERRORS:
+            self._authenticate()  # pylint: disable=protected-access
+            return method(self, *args, **kwargs)
+
+    return _wrapper
+
 
 class BroadlinkManager:  # pylint: disable=too-few-public-methods
     """Manager class for Broadlink device."""
@@ -27,17 +71,53 @@ class BroadlinkManager:  # pylint: disable=too-few-public-methods
             mac_addr: Broadlink MAC address from discover IR command
         """
         self.__dev: rmmini = cast(rmmini, gendevice(int(dev_type, 0), (ip_addr, DEFAULT_PORT), mac_addr))
-        self.__dev.auth()
+        self.__authenticated = False
 
     @property
     def device(self) -> rmmini:
-        """Broadlink device.
+        """Broadlink device, authenticated on first access.
 
         Returns:
             rmmini device object
         """
+        self._ensure_authenticated()
         return self.__dev
 
+    def _ensure_authenticated(self) -> None:
+        # the session is shared by all the learning calls, until the device closes it
+        if not self.__authenticated:
+            self._authenticate()
+
+    def _authenticate(self) -> None:
+        self.__dev.auth()
+        self.__authenticated = True
+
+    def _check_data(self) -> Optional[bytes]:
+        # python-broadlink signals "nothing learnt yet" raising an error, map it to None for the poll loop
+        try:
+            return self.device.check_data()
+        except (ReadError, StorageError):
+            return None
+
+    @_reauth_on_stale_session
+    def _listen(self) -> Optional[str]:
+        # a new session drops learning mode, so a stale session restarts from enter_learning
+        self.device.enter_learning()
+        start = monotonic()
+        _ret = None
+        _delay = _POLL_MIN_INTERVAL
+        while monotonic() - start < DEFAULT_TIMEOUT:
+            # poll first, so a code already captured by the device is returned without waiting
+            data = self._check_data()
+            if data is not None:
+                _ret = _b64encode(data)
+                break
+            # exponential backoff: short waits catch fast captures, the cap avoids busy polling
+            sleep(min(_delay, max(0.0, DEFAULT_TIMEOUT - (monotonic() - start))))
+            _delay = min(_delay * _POLL_BACKOFF_RATE, _POLL_MAX_INTERVAL)
+
+        return _ret
+
     def learn_single_code(self) -> Optional[str]:
         """Process to learn single IR code.
 
@@ -45,18 +125,4 @@ class BroadlinkManager:  # pylint: disable=too-few-public-methods
             Optional[str]: str if IR code was listened, None otherwise
         """
         click.echo("Listening...")
-        self.device.enter_learning()
-        start = time.time()
-        _ret = None
-        while time.time() - start < DEFAULT_TIMEOUT:
-            time.sleep(1)
-            try:
-                data: bytes = self.device.check_data()
-            except (ReadError, StorageError):
-                continue
-            else:
-                b64_data = binascii.b2a_base64(data, newline=False)
-                _ret = b64_data.decode('utf-8')
-                break
-
-        return _ret
+        return self._listen()
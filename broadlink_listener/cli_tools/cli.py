@@ -4,16 +4,17 @@
 
 """Console script for broadlink_listener."""
 
-import inspect
 import logging
 import sys
-import types
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import cast
+from typing import Optional
 
 import click
 from broadlink import discover
 from broadlink.const import DEFAULT_BCAST_ADDR, DEFAULT_TIMEOUT
+from broadlink.device import Device
+from broadlink.exceptions import BroadlinkException
 from cloup import HelpFormatter, HelpTheme, Style, group, option, option_group
 
 from broadlink_listener import __version__
@@ -21,6 +22,8 @@ from broadlink_listener.cli_tools.broadlink_manager import BroadlinkManager
 from broadlink_listener.cli_tools.smartir_manager import SmartIrManager
 from broadlink_listener.cli_tools.utils import configure_logger, get_local_ip_address
 
+_MAX_AUTH_WORKERS = 16
+
 formatter_settings = HelpFormatter.settings(
     theme=HelpTheme(
         invoked_command=Style(fg='bright_yellow'),
@@ -50,39 +53,58 @@ def main(loglevel: str):
 
     # noqa: DAR101
     """
-    _fnc_name = cast(types.FrameType, inspect.currentframe()).f_code.co_name
-    _complete_doc = inspect.getdoc(eval(_fnc_name))  # pylint: disable=eval-used  # nosec B307
-    _doc = f"{_complete_doc}".split('\n')[0]  # use only doc first row
-    _str = f"{_doc[:-1]} - v{__version__}"
-    click.echo(f"{_str}")
-    click.echo("=" * len(_str))
-    click.echo("Broadlink IR codes listener and SmartIR json generator.")
+    # banner from the first row of the help text click already took from this docstring, no frame inspection
+    _doc_first_row = f"{main.help}".split('\n', 1)[0]
+    _banner = f"{_doc_first_row[:-1]} - v{__version__}"
+    click.echo(f"{_banner}\n{'=' * len(_banner)}\nBroadlink IR codes listener and SmartIR json generator.")
 
     # ctx.ensure_object(dict)
     # ctx.obj = loglevel
     configure_logger(loglevel)
 
 
+def _auth_device(device: Device) -> bool:
+    """Authenticate to discovered device, an error on one device does not stop the others.
+
+    Arguments:
+        device: device found by discover
+
+    Returns:
+        True if authenticated, False otherwise
+    """
+    try:
+        return device.auth()
+    except BroadlinkException as _err:
+        logging.error("Error authenticating with device : %s - %s", device.host, _err)
+        return False
+
+
 @main.command(help="Discover Broadlink IR")
-@click.argument('local_ip', type=str, default=get_local_ip_address(), required=True)
-def discover_ir(local_ip: str):
+@click.argument('local_ip', type=str, default=None, required=False)
+def discover_ir(local_ip: Optional[str]):
     """Discover Broadlink IR, code from python-broadlink.
 
     Arguments:
-        local_ip: IP address of this machine connected to same network Broadlink IR is connected to.
+        local_ip: IP address of this machine connected to same network Broadlink IR is connected to, detected
+                  from main interface when not given.
     """
+    # detected here and not as argument default, to not probe the network at every import
+    local_ip = local_ip or get_local_ip_address()
     devices = discover(timeout=DEFAULT_TIMEOUT, local_ip_address=local_ip, discover_ip_address=DEFAULT_BCAST_ADDR)
-    for device in devices:
-        if device.auth():
-            click.echo("###########################################")
-            click.echo(f"Device Type: {device.type}")
+    if not devices:
+        return
+    # authentication is a network round-trip per device, run them concurrently keeping discovery order
+    with ThreadPoolExecutor(max_workers=min(len(devices), _MAX_AUTH_WORKERS)) as executor:
+        _authenticated = list(executor.map(_auth_device, devices))
+    for device, _auth in zip(devices, _authenticated):
+        if _auth:
             click.echo(
+                "###########################################\n"
+                f"Device Type: {device.type}\n"
                 f"Broadlink Type: {hex(device.devtype)}\n"
                 f"Broadlink IP Address: {device.host[0]} "
-                f"Broadlink MAC Address: {''.join(format(x, '02x') for x in device.mac)}"
+                f"Broadlink MAC Address: {device.mac.hex()}"
             )
-        else:
-            logging.error("Error authenticating with device : %s", device.host)
 
 
 @main.command(help="Generate SmartIR json file from input one")
@@ -4,26 +4,21 @@
 
 """SmartIR json manager class."""
 
-import glob
-import json
-import os
 import platform
 import re
 import signal
 import sys
-from collections import namedtuple
-from copy import deepcopy
-from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from itertools import product
 from pathlib import Path
 from threading import Event
-from typing import Literal, Optional, Union
+from typing import Dict, Optional
 
 import click
 
 from broadlink_listener.cli_tools.broadlink_manager import BroadlinkManager
+from broadlink_listener.cli_tools.utils import load_json, save_json
 
 
 class _DictKeys(str, Enum):
@@ -39,13 +34,19 @@ class _DictKeys(str, Enum):
     COMMANDS_ENCODING = "commandsEncoding"
 
 
-@dataclass
-class SkipReason:
-    """Data class to describe skip reason."""
-
-    skip: bool
-    field: Optional[Union[Literal[_DictKeys.SWING_MODES], Literal[_DictKeys.TEMPERATURE]]]
+_REQUIRED_KEYS = frozenset(
+    (
+        _DictKeys.CONTROLLER.value,
+        _DictKeys.COMMANDS_ENCODING.value,
+        _DictKeys.MIN_TEMP.value,
+        _DictKeys.MAX_TEMP.value,
+        _DictKeys.OPERATION_MODES.value,
+        _DictKeys.COMMANDS.value,
+    )
+)
 
+# plain string key, looked up on every learnt code and checkpoint
+_COMMANDS_KEY = _DictKeys.COMMANDS.value
 
 _combination_arguments_all = (
     _DictKeys.OPERATION_MODES.value,
@@ -71,14 +72,22 @@ _combination_arguments_none = (
     _DictKeys.TEMPERATURE.value,
 )
 
+# (has fan, has swing) -> combination arguments
+_combination_arguments_by_shape = {
+    (True, True): _combination_arguments_all,
+    (False, True): _combination_arguments_swing,
+    (True, False): _combination_arguments_fan,
+    (False, False): _combination_arguments_none,
+}
 
-_CombinationTupleAll = namedtuple('_CombinationTupleAll', ', '.join(_combination_arguments_all))  # type: ignore
-
-_CombinationTupleSwing = namedtuple('_CombinationTupleSwing', ', '.join(_combination_arguments_swing))  # type: ignore
+_PARTIAL_FILE_INDEX = re.compile(r'_tmp_(\d+)\.json$')
 
-_CombinationTupleFan = namedtuple('_CombinationTupleFan', ', '.join(_combination_arguments_fan))  # type: ignore
 
-_CombinationTupleNone = namedtuple('_CombinationTupleNone', ', '.join(_combination_arguments_none))  # type: ignore
+def _build_levels(levels: list, temperature_keys: tuple) -> dict:
+    # fresh inner dicts at every level, temperature leaves are empty codes
+    if not levels:
+        return dict.fromkeys(temperature_keys, '')
+    return {f"{_k}": _build_levels(levels[1:], temperature_keys) for _k in levels[0]}
 
 
 def _countdown(msg: str, event: Event):
@@ -117,66 +126,59 @@ class SmartIrManager:  # pylint: disable=too-many-instance-attributes
         self.__prompt_event = Event()
         self.__prompt_event.clear()
         self.__json_file_name_path = Path(file_name)
-        with open(str(file_name), "r", encoding='utf-8') as in_file:
-            self.__smartir_dict = json.load(in_file)
+        self.__smartir_dict = load_json(self.__json_file_name_path)
 
         self.__all_combinations: tuple = ()
-        self.__no_temp_on_modes: tuple = no_temp_on_mode
-        self.__no_swing_on_modes: tuple = no_swing_on_mode
-        self.__swing_saved_temp: dict = {}
-        try:
-            _controller = self.__smartir_dict[_DictKeys.CONTROLLER.value]
-            if _controller != "Broadlink":
-                raise click.exceptions.UsageError(f"Controller {_controller} not supported")
-
-            _commands_encoding = self.__smartir_dict[_DictKeys.COMMANDS_ENCODING.value]
-            if _commands_encoding != "Base64":
-                raise click.exceptions.UsageError(f"Encoding {_commands_encoding} not supported")
-
-            self.__min_temp = int(self.__smartir_dict[_DictKeys.MIN_TEMP.value])
-            self.__max_temp = int(self.__smartir_dict[_DictKeys.MAX_TEMP.value])
-            self.__precision_temp = int(self.__smartir_dict.get(_DictKeys.PRECISION.value, 1))
-            self.__op_modes = self.__smartir_dict[_DictKeys.OPERATION_MODES.value]
-            self.__fan_modes = self.__smartir_dict.get(_DictKeys.FAN_MODES.value, None)
-            self.__swing_modes = self.__smartir_dict.get(_DictKeys.SWING_MODES.value, None)
-
-            if not all(list(map(lambda x: x in self.__op_modes, no_swing_on_mode))):
-                raise click.exceptions.UsageError("no-swing-on-mode parameter is using a not-existent operating mode.")
-
-            if not all(list(map(lambda x: x in self.__op_modes, no_temp_on_mode))):
-                raise click.exceptions.UsageError("no-temp-on-mode parameter is using a not-existent operating mode.")
-
-            # fill dict with all empty combination
-            _temp_dict = {
-                f"{t}": deepcopy('') for t in range(self.__min_temp, self.__max_temp + 1, self.__precision_temp)
-            }
-            _swing_dict = None
-            if self.__swing_modes:
-                _swing_dict = {f"{s}": deepcopy(_temp_dict) for s in self.__swing_modes}
-            else:
-                if no_swing_on_mode:
-                    raise click.exceptions.UsageError(
-                        "Add swing to JSON file or do not use --no-swing-on-mode parameter."
-                    )
-            _fan_mode_dict = None
-            if self.__fan_modes:
-                if _swing_dict:
-                    _fan_mode_dict = {f"{f}": deepcopy(_swing_dict) for f in self.__fan_modes}
-                else:
-                    _fan_mode_dict = {f"{f}": deepcopy(_temp_dict) for f in self.__fan_modes}  # type: ignore
-                _operation_dict = {f"{o}": deepcopy(_fan_mode_dict) for o in self.__op_modes}
-            else:
-                if _swing_dict:
-                    _operation_dict = {f"{o}": deepcopy(_swing_dict) for o in self.__op_modes}  # type: ignore
-                else:
-                    _operation_dict = {f"{o}": deepcopy(_temp_dict) for o in self.__op_modes}  # type: ignore
-            self.__smartir_dict[_DictKeys.COMMANDS].update(_operation_dict)
-
-            # overwrite combination if tmp file exist
-            self._load_partial_dict()
-
-        except KeyError as key_err:
-            raise click.exceptions.UsageError(f"Missing mandatory field in json file: {key_err}") from None
+        self.__leaf_cache: Dict[tuple, dict] = {}
+        self.__no_temp_on_modes: frozenset = frozenset(no_temp_on_mode)
+        self.__no_swing_on_modes: frozenset = frozenset(no_swing_on_mode)
+
+        _missing = _REQUIRED_KEYS - self.__smartir_dict.keys()
+        if _missing:
+            raise click.exceptions.UsageError(f"Missing mandatory field in json file: {', '.join(sorted(_missing))}")
+
+        _controller = self.__smartir_dict[_DictKeys.CONTROLLER.value]
+        if _controller != "Broadlink":
+            raise click.exceptions.UsageError(f"Controller {_controller} not supported")
+
+        _commands_encoding = self.__smartir_dict[_DictKeys.COMMANDS_ENCODING.value]
+        if _commands_encoding != "Base64":
+            raise click.exceptions.UsageError(f"Encoding {_commands_encoding} not supported")
+
+        self.__min_temp = int(self.__smartir_dict[_DictKeys.MIN_TEMP.value])
+        self.__max_temp = int(self.__smartir_dict[_DictKeys.MAX_TEMP.value])
+        self.__precision_temp = int(self.__smartir_dict.get(_DictKeys.PRECISION.value, 1))
+        self.__op_modes = self.__smartir_dict[_DictKeys.OPERATION_MODES.value]
+        self.__fan_modes = self.__smartir_dict.get(_DictKeys.FAN_MODES.value, None)
+        self.__swing_modes = self.__smartir_dict.get(_DictKeys.SWING_MODES.value, None)
+        # temperature keys of the commands tree, formatted once and shared by dict build and combinations
+        self.__temperature_keys = tuple(
+            f"{t}" for t in range(self.__min_temp, self.__max_temp + 1, self.__precision_temp)
+        )
+
+        _op_set = set(self.__op_modes)
+        _unknown = set(no_swing_on_mode) - _op_set
+        if _unknown:
+            raise click.exceptions.UsageError(
+                f"no-swing-on-mode parameter is using a not-existent operating mode: {', '.join(sorted(_unknown))}."
+            )
+
+        _unknown = set(no_temp_on_mode) - _op_set
+        if _unknown:
+            raise click.exceptions.UsageError(
+                f"no-temp-on-mode parameter is using a not-existent operating mode: {', '.join(sorted(_unknown))}."
+            )
+
+        if no_swing_on_mode and not self.__swing_modes:
+            raise click.exceptions.UsageError("Add swing to JSON file or do not use --no-swing-on-mode parameter.")
+
+        # fill dict with all empty combination, one nesting level per mode list present in the json file
+        _levels = [self.__op_modes] + [_m for _m in (self.__fan_modes, self.__swing_modes) if _m]
+        _operation_dict = _build_levels(_levels, self.__temperature_keys)
+        self.__smartir_dict[_COMMANDS_KEY].update(_operation_dict)
+
+        # overwrite combination if tmp file exist
+        self._load_partial_dict()
 
         self._setup_combinations()
         self.__temperature = ''
@@ -209,60 +211,36 @@ class SmartIrManager:  # pylint: disable=too-many-instance-attributes
         sys.exit(2)
 
     def _setup_combinations(self):
-        _variable_args = [self.__fan_modes, self.__swing_modes]
-        if all(_variable_args):
-            __combinations = product(
-                self.__op_modes,
-                self.__fan_modes,
-                self.__swing_modes,
-                range(self.__min_temp, self.__max_temp + 1, self.__precision_temp),
-            )
-
-            def _return_named_tuple():
-                for _c in __combinations:
-                    yield _CombinationTupleAll(_c[0], _c[1], _c[2], _c[3])
-
-            self.__all_combinations = _return_named_tuple()
-            self.__combination_arguments = _combination_arguments_all
-        else:
-            if any(_variable_args):
-                if self.__swing_modes:
-                    __combinations = product(
-                        self.__op_modes,
-                        self.__swing_modes,
-                        range(self.__min_temp, self.__max_temp + 1, self.__precision_temp),
-                    )
-
-                    def _return_named_tuple():
-                        for _c in __combinations:
-                            yield _CombinationTupleSwing(_c[0], _c[1], _c[2])
-
-                    self.__all_combinations = _return_named_tuple()
-                    self.__combination_arguments = _combination_arguments_swing
-                else:
-                    __combinations = product(
-                        self.__op_modes,
-                        self.__fan_modes,
-                        range(self.__min_temp, self.__max_temp + 1, self.__precision_temp),
-                    )
-
-                    def _return_named_tuple():
-                        for _c in __combinations:
-                            yield _CombinationTupleFan(_c[0], _c[1], _c[2])
-
-                    self.__all_combinations = _return_named_tuple()
-                    self.__combination_arguments = _combination_arguments_fan
-            else:
-                __combinations = product(
-                    self.__op_modes, range(self.__min_temp, self.__max_temp + 1, self.__precision_temp)
-                )
-
-                def _return_named_tuple():
-                    for _c in __combinations:
-                        yield _CombinationTupleNone(_c[0], _c[1])
-
-                self.__all_combinations = _return_named_tuple()
-                self.__combination_arguments = _combination_arguments_none
+        # shape of the commands tree is fixed for the whole object life, resolve it once
+        self.__has_fan = bool(self.__fan_modes)
+        self.__has_swing = bool(self.__swing_modes)
+        self.__combination_arguments = _combination_arguments_by_shape[(self.__has_fan, self.__has_swing)]
+
+        # prompt text template, one row per combination argument
+        self.__combination_template = '\n'.join(f'-> {_a} = {{}}' for _a in self.__combination_arguments)
+
+        _temperatures = self.__temperature_keys
+
+        # skip rules only depend on the operating mode: resolve them once as (skip swing, skip temperature) per mode
+        self.__skip_by_op = {
+            _op: (self.__has_swing and _op in self.__no_swing_on_modes, _op in self.__no_temp_on_modes)
+            for _op in self.__op_modes
+        }
+
+        def _return_combinations():
+            # modes without swing or temperature only need the first swing or the min temperature to be learnt,
+            # pruned combinations are filled with the same code by _set_pruned_values
+            for _op in self.__op_modes:
+                _skip_swing, _skip_temp = self.__skip_by_op[_op]
+                _axes: list = [(_op,)]
+                if self.__has_fan:
+                    _axes.append(self.__fan_modes)
+                if self.__has_swing:
+                    _axes.append(self.__swing_modes[:1] if _skip_swing else self.__swing_modes)
+                _axes.append(_temperatures[:1] if _skip_temp else _temperatures)
+                yield from product(*_axes)
+
+        self.__all_combinations = tuple(_return_combinations())
 
     @property
     def temperature(self) -> str:
@@ -345,43 +323,25 @@ class SmartIrManager:  # pylint: disable=too-many-instance-attributes
         """
         return self.__partial_inc
 
+    def _leaf_dict(self) -> dict:
+        # innermost dict, the one keyed by temperature, of current operation, fan and swing modes;
+        # cached because all the temperatures of the same modes are visited one after the other
+        _key = (self.operation_mode, self.fan_mode, self.swing_mode)
+        _leaf = self.__leaf_cache.get(_key)
+        if _leaf is None:
+            _leaf = self.__smartir_dict[_COMMANDS_KEY][self.operation_mode]
+            if self.__has_fan:
+                _leaf = _leaf[self.fan_mode]
+            if self.__has_swing:
+                _leaf = _leaf[self.swing_mode]
+            self.__leaf_cache[_key] = _leaf
+        return _leaf
+
     def _set_dict_value(self, value: str) -> None:
-        if _DictKeys.FAN_MODES in self.__combination_arguments:
-            if _DictKeys.SWING_MODES in self.__combination_arguments:
-                self.__smartir_dict[_DictKeys.COMMANDS.value][self.operation_mode][self.fan_mode][self.swing_mode][
-                    self.temperature
-                ] = value
-            else:
-                self.__smartir_dict[_DictKeys.COMMANDS.value][self.operation_mode][self.fan_mode][
-                    self.temperature
-                ] = value
-        else:
-            if _DictKeys.SWING_MODES in self.__combination_arguments:
-                self.__smartir_dict[_DictKeys.COMMANDS.value][self.operation_mode][self.swing_mode][
-                    self.temperature
-                ] = value
-            else:
-                self.__smartir_dict[_DictKeys.COMMANDS.value][self.operation_mode][self.temperature] = value
+        self._leaf_dict()[self.temperature] = value
 
     def _get_dict_value(self) -> str:
-        _value = ''
-        if _DictKeys.FAN_MODES in self.__combination_arguments:
-            if _DictKeys.SWING_MODES in self.__combination_arguments:
-                _value = self.__smartir_dict[_DictKeys.COMMANDS.value][self.operation_mode][self.fan_mode][
-                    self.swing_mode
-                ][self.temperature]
-            else:
-                _value = self.__smartir_dict[_DictKeys.COMMANDS.value][self.operation_mode][self.fan_mode][
-                    self.temperature
-                ]
-        else:
-            if _DictKeys.SWING_MODES in self.__combination_arguments:
-                _value = self.__smartir_dict[_DictKeys.COMMANDS.value][self.operation_mode][self.swing_mode][
-                    self.temperature
-                ]
-            else:
-                _value = self.__smartir_dict[_DictKeys.COMMANDS.value][self.operation_mode][self.temperature]
-        return _value
+        return self._leaf_dict()[self.temperature]
 
     def save_dict(self):
         """Save modified dict to output json file."""
@@ -389,14 +349,10 @@ class SmartIrManager:  # pylint: disable=too-many-instance-attributes
         _modified_file_name = self.__json_file_name_path.parent.joinpath(
             f'{self.__json_file_name_path.stem}_{now.strftime("%Y%m%d_%H%M%S")}.json'
         )
-        with open(_modified_file_name, 'w', encoding='utf-8') as out_file:
-            json.dump(self.__smartir_dict, out_file)
+        save_json(_modified_file_name, self.__smartir_dict)
         click.echo(f"Created new file {_modified_file_name}")
-        _previous = glob.glob(
-            os.path.join(self.__json_file_name_path.parent, f'{self.__json_file_name_path.stem}_tmp_*.json')
-        )
-        for _file in _previous:
-            os.remove(_file)
+        for _file in self._partial_files().values():
+            _file.unlink(missing_ok=True)
 
     def _save_partial_dict(self):
         # save with incremental 3 numbers to sort correctly when load
@@ -404,31 +360,32 @@ class SmartIrManager:  # pylint: disable=too-many-instance-attributes
             f'{self.__json_file_name_path.stem}_tmp_{self.__partial_inc:03}.json'
         )
 
-        try:
-            _no_off = deepcopy(self.__smartir_dict)
-            del _no_off['commands']['off']
-        except KeyError:
+        _commands = self.__smartir_dict[_COMMANDS_KEY]
+        if 'off' not in _commands:
             return
 
-        with open(_modified_file_name, 'w', encoding='utf-8') as out_file:
-            json.dump(_no_off[_DictKeys.COMMANDS.value], out_file, indent=2)
+        # shallow view without off command, codes are immutable strings and are only serialized
+        _no_off = {_k: _v for _k, _v in _commands.items() if _k != 'off'}
+        save_json(_modified_file_name, _no_off, indent=True)
         self.__partial_inc += 1
 
+    def _partial_files(self) -> Dict[int, Path]:
+        # partial files saved for input json, keyed by their incremental index
+        _partial = {}
+        for _file in self.__json_file_name_path.parent.glob(f'{self.__json_file_name_path.stem}_tmp_*.json'):
+            _res = _PARTIAL_FILE_INDEX.search(_file.name)
+            if _res:
+                _partial[int(_res.group(1))] = _file
+        return _partial
+
     def _load_partial_dict(self):
-        _previous = glob.glob(
-            os.path.join(self.__json_file_name_path.parent, f'{self.__json_file_name_path.stem}_tmp_*.json')
-        )
-        _previous.sort()
-        try:
+        _previous = self._partial_files()
+        if _previous:
             # load last file that's the most updated
-            _last_file = _previous[-1]
-            with open(str(_last_file), "r", encoding='utf-8') as partial_file:
-                self.__smartir_dict[_DictKeys.COMMANDS.value].update(json.load(partial_file))
-            _pattern = re.compile(fr'{self.__json_file_name_path.stem}_tmp_(\d+).json')
-            _res = _pattern.search(_last_file)
-            self.__partial_inc = int(_res.group(1))
-        except IndexError:
-            pass
+            self.__partial_inc = max(_previous)
+            self.__smartir_dict[_COMMANDS_KEY].update(load_json(_previous[self.__partial_inc]))
+            # loaded modes replace the existing sub-dicts
+            self.__leaf_cache.clear()
 
     def learn_off(self):
         """Learn OFF command that's outside the combination.
@@ -447,56 +404,33 @@ class SmartIrManager:  # pylint: disable=too-many-instance-attributes
         _off = self.__broadlink_manager.learn_single_code()
         if not _off:
             raise click.exceptions.UsageError("No IR signal learnt for OFF command within timeout.")
-        self.__smartir_dict[_DictKeys.COMMANDS.value]["off"] = _off
+        self.__smartir_dict[_COMMANDS_KEY]["off"] = _off
 
-    def learn_all(self):  # pylint: disable=too-many-branches
+    def learn_all(self):
         """Learn all the commands depending on calculated combination.
 
         Raises:
             UsageError: if no IR signal is learnt within timeout
         """
-        _previous_code = None
         _previous_combination: Optional[tuple] = None
-        for comb in self.__all_combinations:  # pylint: disable=too-many-nested-blocks
-            self.operation_mode = comb.operationModes
-            if _DictKeys.FAN_MODES in comb._fields:
-                self.fan_mode = comb.fanModes
-            if _DictKeys.SWING_MODES in comb._fields:
-                self.swing_mode = comb.swingModes
-            self.temperature = str(comb.temperature)
+        for comb in self.__all_combinations:
+            # plain tuples laid out as (operation, [fan], [swing], temperature)
+            self.operation_mode = comb[0]
+            if self.__has_fan:
+                self.fan_mode = comb[1]
+            if self.__has_swing:
+                self.swing_mode = comb[-2]
+            self.temperature = comb[-1]
 
             if self._get_dict_value() != '':
                 self.__prompt_event.set()
                 continue
 
-            _do_skip = self._skip_learning(comb)
-            if _do_skip.skip:
-                # must read the first temperature and then reuse the same for next combination
-                if _do_skip.field == _DictKeys.TEMPERATURE:
-                    if comb.temperature > self.__min_temp:
-                        # code @ min_temp already recorded
-                        self._set_dict_value(_previous_code)
-                        continue
-
-                if _do_skip.field == _DictKeys.SWING_MODES:
-                    _previous_code = self.__swing_saved_temp.get(self.temperature, None)
-                    if _previous_code:
-                        if isinstance(_previous_code, dict):
-                            # there also is the fan level saved
-                            _temp_code = _previous_code.get(self.fan_mode)
-                            if _temp_code:
-                                self._set_dict_value(_temp_code)
-                                continue
-                        else:
-                            # no fan
-                            self._set_dict_value(_previous_code)
-                            continue
-
-            if _previous_combination:
-                for i in range(0, len(comb) - 1):
-                    if _previous_combination[i] != comb[i]:  # pylint: disable=unsubscriptable-object
-                        self.__prompt_event.set()
-                        self._save_partial_dict()
+            # temperature varies fastest, a change in any other field starts a new group of codes: prompt user and
+            # checkpoint once per group
+            if _previous_combination and _previous_combination[:-1] != comb[:-1]:
+                self.__prompt_event.set()
+                self._save_partial_dict()
             _previous_combination = comb
 
             _combination_str = self._get_combination(comb)
@@ -507,35 +441,26 @@ class SmartIrManager:  # pylint: disable=too-many-instance-attributes
                 self.__prompt_event,
             )
             _code = self.__broadlink_manager.learn_single_code()
-            _previous_code = _code
             if not _code:
                 self._save_partial_dict()
                 raise click.exceptions.UsageError(f"No IR signal learnt for {_combination_str} command within timeout.")
 
-            # swing modes must be saved because all temperature need to be listened
-            if _do_skip.skip and _do_skip.field == _DictKeys.SWING_MODES:
-                if _DictKeys.FAN_MODES in comb._fields:
-                    self.__swing_saved_temp[self.temperature] = {self.fan_mode: _code}
-                else:
-                    self.__swing_saved_temp[self.temperature] = _code
-
-            self._set_dict_value(_code)
+            self._set_pruned_values(_code)
         click.echo("All combination learnt.")
 
     def _get_combination(self, combination: tuple) -> str:
-        _mixed = zip(self.__combination_arguments, combination)
-        _ret = []
-        for _m, _v in _mixed:
-            _ret.append(f'-> {_m} = {_v}')
-        return '\n'.join(_ret)
-
-    def _skip_learning(
-        self, comb: Union[_CombinationTupleAll, _CombinationTupleSwing, _CombinationTupleFan, _CombinationTupleNone]
-    ) -> SkipReason:
-        _ret = SkipReason(False, None)
-        # swing mode is optional, so need its check
-        if _DictKeys.SWING_MODES in comb._fields and comb.operationModes in self.__no_swing_on_modes:  # type: ignore
-            _ret = SkipReason(True, _DictKeys.SWING_MODES)
-        if comb.operationModes in self.__no_temp_on_modes:  # type: ignore
-            _ret = SkipReason(True, _DictKeys.TEMPERATURE)
-        return _ret
+        return self.__combination_template.format(*combination)
+
+    def _set_pruned_values(self, value: str) -> None:
+        # the code learnt for current combination is valid also for every swing and/or temperature that has
+        # been pruned for current operating mode
+        _skip_swing, _skip_temp = self.__skip_by_op[self.operation_mode]
+        _swings = self.__swing_modes if _skip_swing else [self.swing_mode]
+        _temperatures = self.__temperature_keys if _skip_temp else (self.temperature,)
+
+        _learnt_swing, _learnt_temperature = self.swing_mode, self.temperature
+        for _swing, _temperature in product(_swings, _temperatures):
+            self.swing_mode = _swing
+            self.temperature = _temperature
+            self._set_dict_value(value)
+        self.swing_mode, self.temperature = _learnt_swing, _learnt_temperature
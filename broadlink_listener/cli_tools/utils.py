@@ -4,8 +4,25 @@
 
 """Module with utility methods."""
 
+import functools
+import json
 import logging
+import os
 import socket
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+_LOG_LEVELS = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+}
 
 
 def configure_logger(loglevel: str = 'info') -> None:
@@ -15,13 +32,7 @@ def configure_logger(loglevel: str = 'info') -> None:
         loglevel: level of logging facility
     """
     # configure logging
-    _log_level = logging.INFO
-    if loglevel.lower() == 'debug':
-        _log_level = logging.DEBUG
-    elif loglevel.lower() == 'warning':
-        _log_level = logging.WARNING
-    elif loglevel.lower() == 'error':
-        _log_level = logging.ERROR
+    _log_level = _LOG_LEVELS.get(loglevel.lower(), logging.INFO)
 
     logging.basicConfig(
         level=_log_level,
@@ -30,8 +41,9 @@ def configure_logger(loglevel: str = 'info') -> None:
     )
 
 
+@functools.lru_cache(maxsize=1)
 def get_local_ip_address() -> str:
-    """Returns local IP address for main interface.
+    """Returns local IP address for main interface, detected once per process.
 
     Returns:
         the local host's IP address configured
@@ -45,3 +57,40 @@ def get_local_ip_address() -> str:
         except (TimeoutError, InterruptedError, Exception):  # pylint: disable=broad-except
             _ip = '127.0.0.1'
     return _ip
+
+
+def load_json(file_name: Path) -> dict:
+    """Load json file content, parsing it with orjson when available.
+
+    Arguments:
+        file_name: path of json file to be read
+
+    Returns:
+        json's content as dict
+    """
+    _content = Path(file_name).read_bytes()
+    if orjson is not None:
+        return orjson.loads(_content)
+    return json.loads(_content)
+
+
+def save_json(file_name: Path, content: dict, indent: bool = False) -> None:
+    """Save dict to json file atomically, serializing it with orjson when available.
+
+    Arguments:
+        file_name: path of json file to be written
+        content: dict to be saved
+        indent: indent output with two spaces
+    """
+    if orjson is not None:
+        _data = orjson.dumps(content, option=orjson.OPT_INDENT_2 if indent else None)
+    else:
+        # same layout as orjson: compact separators unless indented, utf-8 instead of ascii escapes
+        _data = json.dumps(
+            content, indent=2 if indent else None, separators=None if indent else (',', ':'), ensure_ascii=False
+        ).encode('utf-8')
+    # write aside and rename, an interrupted write never leaves a truncated json behind
+    _path = Path(file_name)
+    _tmp_path = _path.with_name(f"{_path.name}.tmp")
+    _tmp_path.write_bytes(_data)
+    os.replace(_tmp_path, _path)
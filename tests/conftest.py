@@ -5,29 +5,73 @@
 """Pytest conftest."""
 
 import binascii
-import glob
 import json
 import os
 import re
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Generator
+from unittest.mock import Mock, patch
 
 import pytest
 from click.testing import CliRunner
 
+from broadlink_listener.cli_tools.broadlink_manager import BroadlinkManager
 
-def _remove_tmp_files(file_pattern=r"[a-zA-Z_]*_tmp[_\d]+.json"):
+_DATA_DIR = Path(__file__).parent.joinpath("data")
+_PARTIAL_DIR = Path(__file__).parent.joinpath("partial_dicts")
+
+# files generated by tests: partial dicts and final dicts with timestamp
+_TMP_FILES = re.compile(r"[a-zA-Z_]*_tmp[_\d]+.json")
+_SAVED_FILES = re.compile(r"[a-zA-Z_]*_[\d]+_[\d]+.json")
+
+
+def _remove_tmp_files(pattern: re.Pattern = _TMP_FILES) -> None:
     """Utility method to remove test generated files.
 
     Arguments:
-        file_pattern: regex pattern for files to be removed.
+        pattern: compiled regex of file names to be removed.
+    """
+    with os.scandir(_DATA_DIR) as _entries:
+        for _entry in _entries:
+            if pattern.match(_entry.name):
+                os.remove(_entry.path)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _no_sleep() -> Generator:
+    """Never wait for real while polling the device, tests that check delays patch broadlink_manager.sleep again.
+
+    Yields:
+        patched broadlink_manager.sleep, time.sleep is left untouched for other modules
+    """
+    with patch('broadlink_listener.cli_tools.broadlink_manager.sleep') as _sleep:
+        yield _sleep
+
+
+@pytest.fixture
+def device_auth(monkeypatch) -> Mock:
+    """Patch broadlink device authentication with a mock created for each test, so no calls leak between tests.
+
+    Arguments:
+        monkeypatch: pytest monkeypatch fixture
+
+    Returns:
+        mock of broadlink Device's auth method, always successful
+    """
+    _auth = Mock(return_value=True)
+    monkeypatch.setattr('broadlink.device.Device.auth', _auth)
+    return _auth
+
+
+@pytest.fixture
+def broadlink_mng() -> BroadlinkManager:
+    """Broadlink manager of a single test, it authenticates only on first device access so creation is cheap.
+
+    Returns:
+        BroadlinkManager object
     """
-    _pattern = re.compile(file_pattern)
-    _previous = glob.glob(os.path.join(Path.cwd().joinpath("tests").joinpath("data"), '*'))
-    for _file in _previous:
-        if _pattern.match(os.path.basename(_file)):
-            os.remove(_file)
+    return BroadlinkManager('0x51DA', '192.168.1.1', '12345678')
 
 
 @pytest.fixture
@@ -37,7 +81,7 @@ def json_file_not_broadlink() -> Path:
     Returns:
         json's path file
     """
-    return Path.cwd().joinpath("tests").joinpath("data").joinpath("not_broadlink.json")
+    return _DATA_DIR.joinpath("not_broadlink.json")
 
 
 @pytest.fixture
@@ -47,7 +91,7 @@ def json_file_not_base64() -> Path:
     Returns:
         json's path file
     """
-    return Path.cwd().joinpath("tests").joinpath("data").joinpath("not_base64.json")
+    return _DATA_DIR.joinpath("not_base64.json")
 
 
 @pytest.fixture
@@ -57,7 +101,7 @@ def json_file_missing_max_temp() -> Path:
     Returns:
         json's path file
     """
-    return Path.cwd().joinpath("tests").joinpath("data").joinpath("missing_required_max_temp.json")
+    return _DATA_DIR.joinpath("missing_required_max_temp.json")
 
 
 @pytest.fixture
@@ -67,7 +111,7 @@ def json_file_missing_min_temp() -> Path:
     Returns:
         json's path file
     """
-    return Path.cwd().joinpath("tests").joinpath("data").joinpath("missing_required_min_temp.json")
+    return _DATA_DIR.joinpath("missing_required_min_temp.json")
 
 
 @pytest.fixture
@@ -77,9 +121,9 @@ def json_file_good_data_op_mode() -> Generator:
     Yields:
         json's path file
     """
-    yield Path.cwd().joinpath("tests").joinpath("data").joinpath("good_data_op_mode.json")
+    yield _DATA_DIR.joinpath("good_data_op_mode.json")
     _remove_tmp_files()
-    _remove_tmp_files(r"[a-zA-Z_]*_[\d]+_[\d]+.json")
+    _remove_tmp_files(_SAVED_FILES)
 
 
 @pytest.fixture
@@ -89,9 +133,9 @@ def json_file_good_data_op_fan_mode() -> Generator:
     Yields:
         json's path file
     """
-    yield Path.cwd().joinpath("tests").joinpath("data").joinpath("good_data_op_fan_mode.json")
+    yield _DATA_DIR.joinpath("good_data_op_fan_mode.json")
     _remove_tmp_files()
-    _remove_tmp_files(r"[a-zA-Z_]*_[\d]+_[\d]+.json")
+    _remove_tmp_files(_SAVED_FILES)
 
 
 @pytest.fixture
@@ -101,9 +145,9 @@ def json_file_good_data_op_fan_swing_mode() -> Generator:
     Yields:
         json's path file
     """
-    yield Path.cwd().joinpath("tests").joinpath("data").joinpath("good_data_op_fan_swing_mode.json")
+    yield _DATA_DIR.joinpath("good_data_op_fan_swing_mode.json")
     _remove_tmp_files()
-    _remove_tmp_files(r"[a-zA-Z_]*_[\d]+_[\d]+.json")
+    _remove_tmp_files(_SAVED_FILES)
 
 
 @pytest.fixture
@@ -113,9 +157,9 @@ def json_file_good_data_op_swing_mode() -> Generator:
     Yields:
         json's path file
     """
-    yield Path.cwd().joinpath("tests").joinpath("data").joinpath("good_data_op_swing_mode.json")
+    yield _DATA_DIR.joinpath("good_data_op_swing_mode.json")
     _remove_tmp_files()
-    _remove_tmp_files(r"[a-zA-Z_]*_[\d]+_[\d]+.json")
+    _remove_tmp_files(_SAVED_FILES)
 
 
 @pytest.fixture
@@ -125,7 +169,7 @@ def json_file_partial_dict_op_fan_swing_mode() -> Path:
     Returns:
         json's path file
     """
-    return Path.cwd().joinpath("tests").joinpath("partial_dicts").joinpath("good_data_op_fan_swing_mode.json")
+    return _PARTIAL_DIR.joinpath("good_data_op_fan_swing_mode.json")
 
 
 @pytest.fixture
@@ -135,7 +179,7 @@ def json_file_previous_partial_dict_op_fan_swing_mode() -> Path:
     Returns:
         json's path file
     """
-    return Path.cwd().joinpath("tests").joinpath("partial_dicts").joinpath("good_data_op_fan_swing_mode_tmp_003.json")
+    return _PARTIAL_DIR.joinpath("good_data_op_fan_swing_mode_tmp_003.json")
 
 
 @pytest.fixture
@@ -145,7 +189,7 @@ def json_file_partial_dict_op_swing_mode() -> Path:
     Returns:
         json's path file
     """
-    return Path.cwd().joinpath("tests").joinpath("partial_dicts").joinpath("good_data_op_swing_mode.json")
+    return _PARTIAL_DIR.joinpath("good_data_op_swing_mode.json")
 
 
 @pytest.fixture
@@ -155,7 +199,7 @@ def json_file_last_previous_partial_dict_op_swing_mode() -> Path:
     Returns:
         json's path file
     """
-    return Path.cwd().joinpath("tests").joinpath("partial_dicts").joinpath("good_data_op_swing_mode_tmp_003.json")
+    return _PARTIAL_DIR.joinpath("good_data_op_swing_mode_tmp_003.json")
 
 
 @pytest.fixture
@@ -165,12 +209,12 @@ def json_file_missing_operation_modes() -> Path:
     Returns:
         json's path file
     """
-    return Path.cwd().joinpath("tests").joinpath("data").joinpath("missing_required_operation_modes.json")
+    return _DATA_DIR.joinpath("missing_required_operation_modes.json")
 
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def runner(request):
-    """Pytest runner fixture.
+    """Pytest runner fixture, CliRunner keeps no state between invocations so it is shared by the whole session.
 
     Arguments:
         request: pytest request
@@ -188,11 +232,21 @@ def dict_from_json(json_file: Path) -> dict:
         json_file: path of json file
 
     Returns:
-        json's content as dict
+        json's content as a new dict, parsing the small test files is cheaper than caching and copying them
     """
-    with open(str(json_file), "r", encoding='utf-8') as in_file:
-        _expected_dict = json.load(in_file)
-    return _expected_dict
+    return json.loads(Path(json_file).read_bytes())
+
+
+_EXPECTED_CODES = (
+    ('inc', b'12345678'),
+    ('dec', b'87654321'),
+    ('even', b'024681012'),
+    ('odd', b'135791113'),
+    ('upper', b'ABCDEFG'),
+    ('lower', b'abcdefg'),
+    ('last', b'TUVWXYZ'),
+    ('last_lower', b'tuvwxyz'),
+)
 
 
 @dataclass
@@ -223,20 +277,6 @@ class ExpectedValues:
 
     def __init__(self):
         """Object initialization."""
-        self.code_inc = b'12345678'
-        self.code_dec = b'87654321'
-        self.code_even = b'024681012'
-        self.code_odd = b'135791113'
-        self.code_upper = b'ABCDEFG'
-        self.code_lower = b'abcdefg'
-        self.code_last = b'TUVWXYZ'
-        self.code_last_lower = b'tuvwxyz'
-
-        self.expected_inc = ExpectedValues._bytes_to_str(self.code_inc)
-        self.expected_dec = ExpectedValues._bytes_to_str(self.code_dec)
-        self.expected_even = ExpectedValues._bytes_to_str(self.code_even)
-        self.expected_odd = ExpectedValues._bytes_to_str(self.code_odd)
-        self.expected_upper = ExpectedValues._bytes_to_str(self.code_upper)
-        self.expected_lower = ExpectedValues._bytes_to_str(self.code_lower)
-        self.expected_last = ExpectedValues._bytes_to_str(self.code_last)
-        self.expected_last_lower = ExpectedValues._bytes_to_str(self.code_last_lower)
+        for _name, _code in _EXPECTED_CODES:
+            setattr(self, f"code_{_name}", _code)
+            setattr(self, f"expected_{_name}", ExpectedValues._bytes_to_str(_code))
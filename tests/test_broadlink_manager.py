@@ -10,21 +10,22 @@ import broadlink.remote
 import pytest
 from broadlink import gendevice
 from broadlink.const import DEFAULT_PORT
-from broadlink.exceptions import ReadError
+from broadlink.exceptions import AuthorizationError, ConnectionClosedError, ReadError
 
+from broadlink_listener.cli_tools import broadlink_manager
 from broadlink_listener.cli_tools.broadlink_manager import BroadlinkManager
 
 
+@pytest.mark.usefixtures('device_auth')
 class TestBroadlinkManager:
-    """Broadlink manager test class."""
+    """Broadlink manager test class, device authentication is patched by device_auth fixture."""
 
-    @patch('broadlink.device.Device.auth', Mock(return_value=True))
     @patch('broadlink.gendevice')
-    def test_init(self, patched_auth):
+    def test_init(self, patched_gendevice):
         """Test initialization.
 
         Arguments:
-            patched_auth: patched version of broadlink Device's auth method.
+            patched_gendevice: patched version of broadlink gendevice function.
         """
         _ = BroadlinkManager('0x1234', '192.168.1.1', '12345678')
 
@@ -40,22 +41,32 @@ class TestBroadlinkManager:
         assert issubclass(type(_a), broadlink.remote.rmmini)
         assert hasattr(_a, 'enter_learning')
 
-    @patch('broadlink.device.Device.auth', Mock(return_value=True))
     def test_broadlink_manager_device(self):
         """Test rmmini device creation with BroadlinkManager."""
         _a = BroadlinkManager('0x51DA', '192.168.1.1', '12345678')
         assert issubclass(type(_a.device), broadlink.remote.rmmini)
         assert hasattr(_a.device, 'enter_learning')
 
-    def test_learn_code(self):
-        """Test rmmini device learn mode."""
+    @pytest.mark.parametrize(
+        'use_pybase64',
+        [pytest.param(True, marks=pytest.mark.skipif(broadlink_manager.pybase64 is None, reason='no pybase64')), False],
+    )
+    def test_learn_code(self, monkeypatch, use_pybase64):
+        """Test rmmini device learn mode, with and without pybase64 encoder.
+
+        Arguments:
+            monkeypatch: pytest monkeypatch fixture
+            use_pybase64: keep pybase64 encoder, otherwise use stdlib one
+        """
+        if not use_pybase64:
+            monkeypatch.setattr(broadlink_manager, 'pybase64', None)
         _code_value = b'12345678'
         b64_data = binascii.b2a_base64(_code_value, newline=False)
         _expected = b64_data.decode('utf-8')
 
         with patch('broadlink.remote.rmmini.enter_learning'), patch(
-            'broadlink.device.Device.auth', Mock(return_value=True)
-        ), patch('broadlink.remote.rmmini.check_data', Mock(return_value=_code_value)):
+            'broadlink.remote.rmmini.check_data', Mock(return_value=_code_value)
+        ):
             _a = BroadlinkManager('0x51DA', '192.168.1.1', '12345678')
             _code = _a.learn_single_code()
             assert _expected == _code
@@ -64,9 +75,9 @@ class TestBroadlinkManager:
         """Test rmmini device learn mode, exception case will retrieve None ."""
         _expected = None
 
-        with patch('time.sleep'), patch('broadlink_listener.cli_tools.broadlink_manager.DEFAULT_TIMEOUT', 1), patch(
-            'broadlink.remote.rmmini.enter_learning'
-        ), patch('broadlink.device.Device.auth', Mock(return_value=True)), patch(
+        with patch('broadlink_listener.cli_tools.broadlink_manager.sleep'), patch(
+            'broadlink_listener.cli_tools.broadlink_manager.DEFAULT_TIMEOUT', 1
+        ), patch('broadlink.remote.rmmini.enter_learning'), patch(
             'broadlink.remote.rmmini.check_data', Mock(side_effect=ReadError(-10))
         ):
 
@@ -74,3 +85,63 @@ class TestBroadlinkManager:
             _code = _a.learn_single_code()
 
             assert _expected == _code
+
+    def test_learn_code_no_wait(self):
+        """Test rmmini device learn mode, already captured code is returned without sleeping."""
+        with patch('broadlink_listener.cli_tools.broadlink_manager.sleep') as _sleep, patch(
+            'broadlink.remote.rmmini.enter_learning'
+        ), patch('broadlink.remote.rmmini.check_data', Mock(return_value=b'12345678')):
+            _a = BroadlinkManager('0x51DA', '192.168.1.1', '12345678')
+            _ = _a.learn_single_code()
+            _sleep.assert_not_called()
+
+    def test_learn_code_backoff(self):
+        """Test rmmini device learn mode, poll interval grows up to its cap."""
+        with patch('broadlink_listener.cli_tools.broadlink_manager.sleep') as _sleep, patch(
+            'broadlink.remote.rmmini.enter_learning'
+        ), patch('broadlink.remote.rmmini.check_data', Mock(side_effect=[ReadError(-10)] * 12 + [b'12345678'])):
+            _a = BroadlinkManager('0x51DA', '192.168.1.1', '12345678')
+            assert _a.learn_single_code() is not None
+            _delays = [_c.args[0] for _c in _sleep.call_args_list]
+            assert _delays == sorted(_delays)
+            assert _delays[0] == pytest.approx(0.02)
+            assert max(_delays) == pytest.approx(0.5)
+
+    def test_auth_once(self, device_auth):
+        """Test device is authenticated once, on first access, and shared by learning calls.
+
+        Arguments:
+            device_auth: patched device authentication
+        """
+        with patch('broadlink.remote.rmmini.enter_learning'), patch(
+            'broadlink.remote.rmmini.check_data', Mock(return_value=b'12345678')
+        ):
+            _a = BroadlinkManager('0x51DA', '192.168.1.1', '12345678')
+            device_auth.assert_not_called()
+            _ = _a.learn_single_code()
+            _ = _a.learn_single_code()
+            device_auth.assert_called_once()
+
+    @pytest.mark.parametrize(
+        'enter_learning, check_data',
+        [
+            ([ConnectionClosedError(-2), None], [b'12345678']),
+            ([None, None], [ConnectionClosedError(-2), b'12345678']),
+            ([AuthorizationError(-7), None], [b'12345678']),
+        ],
+    )
+    def test_reauth_stale_session(self, device_auth, enter_learning, check_data):
+        """Test device is authenticated again, and put again in learning mode, when session is closed by the device.
+
+        Arguments:
+            device_auth: patched device authentication
+            enter_learning: results of device enter_learning calls
+            check_data: results of device check_data calls
+        """
+        with patch(
+            'broadlink.remote.rmmini.enter_learning', Mock(side_effect=enter_learning)
+        ) as _enter_learning, patch('broadlink.remote.rmmini.check_data', Mock(side_effect=check_data)):
+            _a = BroadlinkManager('0x51DA', '192.168.1.1', '12345678')
+            assert _a.learn_single_code() is not None
+            assert device_auth.call_count == 2
+            assert _enter_learning.call_count == 2
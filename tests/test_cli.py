@@ -4,34 +4,88 @@
 
 """Tests for `broadlink_listener` package."""
 
-from unittest.mock import Mock, patch
+import logging
+import sys
+from unittest.mock import DEFAULT, Mock, patch
+
+import pytest
+from broadlink.exceptions import NetworkTimeoutError
 
 from broadlink_listener import __version__
 from broadlink_listener.cli_tools import cli
+from broadlink_listener.cli_tools.smartir_manager import SmartIrManager
 
 
-def test_command_line_interface_help(runner):
+@pytest.mark.parametrize(
+    'option, expected',
+    [
+        ('--help', '  --help     Show this message and exit.'),
+        ('--version', __version__),
+    ],
+)
+def test_command_line_interface(runner, option, expected):
     """Test the CLI.
 
     Arguments:
         runner: pytest click CliRunner object
+        option: command line option
+        expected: text expected in command output
     """
-    help_result = runner.invoke(cli.main, ['--help'])
-    assert help_result.exit_code == 0
-    assert '  --help     Show this message and exit.' in help_result.output
+    _result = runner.invoke(cli.main, [option])
+    assert _result.exit_code == 0
+    assert expected in _result.output
 
 
-def test_command_line_interface_version(runner):
-    """Test the CLI.
+def test_py_version():
+    """Dummy test to log python version used by pytest."""
+    logging.getLogger(__name__).debug("in TEST: %s  -- %s", sys.version, sys.version_info)
+
+
+def test_discover_ir(runner, caplog):
+    """Test the CLI discover command, a device that fails authentication does not hide the others.
 
     Arguments:
         runner: pytest click CliRunner object
+        caplog: pytest log capture fixture
     """
-    help_result = runner.invoke(cli.main, ['--version'])
-    assert help_result.exit_code == 0
-    assert __version__ in help_result.output
+    _ok = Mock(type='RMMINI', devtype=0x51DA, host=('192.168.1.1', 80), mac=b'\x12\x34\x56\x78\x9a\xbc')
+    _ok.auth.return_value = True
+    _ko = Mock(host=('192.168.1.2', 80))
+    _ko.auth.side_effect = NetworkTimeoutError(-4000, 'Network timeout', 'No response received within the timeout')
+    with patch('broadlink_listener.cli_tools.cli.discover', Mock(return_value=[_ko, _ok])):
+        _result = runner.invoke(cli.main, ['discover-ir', '192.168.1.100'])
+    assert _result.exit_code == 0
+    assert f'Broadlink listener - v{__version__}\n' in _result.output
+    assert 'Broadlink IP Address: 192.168.1.1 ' in _result.output
+    assert 'Broadlink MAC Address: 123456789abc' in _result.output
+    assert '192.168.1.2' not in _result.output
+    assert "Error authenticating with device : ('192.168.1.2', 80)" in caplog.text
+    _ok.auth.assert_called_once()
+    _ko.auth.assert_called_once()
+
 
+def test_discover_ir_local_ip(runner):
+    """Test the CLI discover command detects local IP address only when not given.
 
+    Arguments:
+        runner: pytest click CliRunner object
+    """
+    with patch('broadlink_listener.cli_tools.cli.discover', Mock(return_value=[])) as _discover, patch(
+        'broadlink_listener.cli_tools.cli.get_local_ip_address', Mock(return_value='192.168.1.150')
+    ) as _local_ip:
+        _result = runner.invoke(cli.main, ['discover-ir'])
+        assert _result.exit_code == 0
+        _local_ip.assert_called_once()
+        assert _discover.call_args.kwargs['local_ip_address'] == '192.168.1.150'
+
+        _local_ip.reset_mock()
+        _ = runner.invoke(cli.main, ['discover-ir', '192.168.1.100'])
+        _local_ip.assert_not_called()
+        assert _discover.call_args.kwargs['local_ip_address'] == '192.168.1.100'
+
+
+@pytest.mark.slow
+@pytest.mark.usefixtures('device_auth')
 def test_generation_smart_ir(runner, json_file_good_data_op_swing_mode):
     """Test the CLI.
 
@@ -40,30 +94,11 @@ def test_generation_smart_ir(runner, json_file_good_data_op_swing_mode):
         json_file_good_data_op_swing_mode: existing json file
     """
     with patch('broadlink.remote.rmmini.enter_learning'), patch(
-        'broadlink.device.Device.auth', Mock(return_value=True)
-    ), patch('broadlink_listener.cli_tools.broadlink_manager.BroadlinkManager'), patch(
-        'broadlink_listener.cli_tools.smartir_manager.SmartIrManager.learn_off'
-    ) as _learn_off, patch(
-        'broadlink_listener.cli_tools.smartir_manager.SmartIrManager.learn_all'
-    ) as _learn_all, patch(
-        'broadlink_listener.cli_tools.smartir_manager.SmartIrManager.save_dict'
-    ) as _save:
+        'broadlink_listener.cli_tools.broadlink_manager.BroadlinkManager'
+    ), patch.multiple(SmartIrManager, learn_off=DEFAULT, learn_all=DEFAULT, save_dict=DEFAULT, autospec=True) as _mocks:
         _ = runner.invoke(
             cli.main, ['generate-smart-ir', str(json_file_good_data_op_swing_mode), '0x1234', '192.168.1.1', '12345678']
         )
-        _learn_off.assert_called_once()
-        _learn_all.assert_called_once()
-        _save.assert_called_once()
-
-
-def test_py_version():
-    """Dummy test to print python version used by pytest."""
-    import sys
-
-    print(f"in TEST: {sys.version}  -- {sys.version_info}")
-    # if sys.version_info <= (3, 9, 18):
-    #     # 3.9 OK
-    #     assert True
-    # else:
-    #     # 3.10 FAIL
-    #     assert False
+        _mocks['learn_off'].assert_called_once()
+        _mocks['learn_all'].assert_called_once()
+        _mocks['save_dict'].assert_called_once()
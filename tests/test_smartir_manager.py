@@ -4,869 +4,450 @@
 
 """Test smartir manager module."""
 
-from itertools import cycle
+from itertools import cycle, repeat
+from typing import Iterator
 from unittest.mock import Mock, patch
 
 import click
 import pytest
 from freezegun import freeze_time
 
-from broadlink_listener.cli_tools.smartir_manager import BroadlinkManager, SmartIrManager
+from broadlink_listener.cli_tools.smartir_manager import SmartIrManager
 from tests.conftest import ExpectedValues, dict_from_json
 
+_EV = ExpectedValues()
+
+# codes returned by the patched device, in learning order
+_CODE_SEQ = (
+    _EV.code_inc,
+    _EV.code_dec,
+    _EV.code_odd,
+    _EV.code_even,
+    _EV.code_lower,
+    _EV.code_upper,
+    _EV.code_last,
+    _EV.code_last_lower,
+)
+
+# expected json values of _CODE_SEQ
+_EXPECTED_SEQ = (
+    _EV.expected_inc,
+    _EV.expected_dec,
+    _EV.expected_odd,
+    _EV.expected_even,
+    _EV.expected_lower,
+    _EV.expected_upper,
+    _EV.expected_last,
+    _EV.expected_last_lower,
+)
+
+# modes of json test files
+_OP_MODES = ('cool', 'heat')
+_FAN_MODES = ('low', 'high')
+_SWING_MODES = ('up', 'down')
+_TEMPERATURES = ('18', '19', '20')
+
+
+def _commands_tree(levels: tuple, values: Iterator) -> dict:
+    """Build nested commands dict, one level per tuple of keys.
+
+    Arguments:
+        levels: keys of each level, the last one holds temperatures
+        values: leaf values, consumed in learning order
+
+    Returns:
+        nested commands dict
+    """
+    if len(levels) == 1:
+        return {_k: next(values) for _k in levels[0]}
+    return {_k: _commands_tree(levels[1:], values) for _k in levels[0]}
+
+
+@pytest.fixture(autouse=True)
+def _broadlink_device(monkeypatch, device_auth):  # pylint: disable=unused-argument
+    """Patch broadlink device and user prompts, device check_data cycles over _CODE_SEQ.
+
+    Arguments:
+        monkeypatch: pytest fixture, tests can patch check_data again to return other codes
+        device_auth: patched device authentication
+    """
+    monkeypatch.setattr('broadlink.remote.rmmini.enter_learning', lambda _device: None)
+    monkeypatch.setattr('builtins.input', lambda _prompt='': '')
+    # builtin method is not bound to the device instance and records no calls
+    monkeypatch.setattr('broadlink.remote.rmmini.check_data', cycle(_CODE_SEQ).__next__)
+
 
 class TestSmartIR:
     """SmartIR manager test class."""
 
-    def test_not_broadlink(self, json_file_not_broadlink):
-        """Test controller not supported.
-
-        Arguments:
-            json_file_not_broadlink: pytest fixture
-        """
-        with pytest.raises(click.exceptions.UsageError):
-            _ = SmartIrManager(json_file_not_broadlink, Mock())
-
-    def test_not_base64(self, json_file_not_base64):
-        """Test encoding not supported.
-
-        Arguments:
-            json_file_not_base64: pytest fixture
-        """
-        with pytest.raises(click.exceptions.UsageError):
-            _ = SmartIrManager(json_file_not_base64, Mock())
-
-    def test_missing_min_temp(self, json_file_missing_min_temp):
-        """Test missing min temp.
-
-        Arguments:
-            json_file_missing_min_temp: pytest fixture
-        """
-        with pytest.raises(click.exceptions.UsageError):
-            _ = SmartIrManager(json_file_missing_min_temp, Mock())
-
-    def test_missing_max_temp(self, json_file_missing_max_temp):
-        """Test missing max temp.
-
-        Arguments:
-            json_file_missing_max_temp: pytest fixture
-        """
-        with pytest.raises(click.exceptions.UsageError):
-            _ = SmartIrManager(json_file_missing_max_temp, Mock())
-
-    def test_missing_operation_modes(self, json_file_missing_operation_modes):
-        """Test missing operation mode.
-
-        Arguments:
-            json_file_missing_operation_modes: pytest fixture
-        """
-        with pytest.raises(click.exceptions.UsageError):
-            _ = SmartIrManager(json_file_missing_operation_modes, Mock())
-
-    def test_learning_op_mode(self, json_file_good_data_op_mode):
-        """Test dict generation, operationMode only.
-
-        Arguments:
-            json_file_good_data_op_mode: json file
-        """
-        _expected_values = ExpectedValues()
-        _expected_dict = dict_from_json(json_file_good_data_op_mode)
-
-        _expect_dict_before_learn = dict(_expected_dict)
-        _expect_dict_before_learn['commands'] = {
-            'off': _expected_dict['commands']['off'],
-            'cool': {
-                '18': '',
-                '19': '',
-                '20': '',
-            },
-            'heat': {
-                '18': '',
-                '19': '',
-                '20': '',
-            },
-        }
-
-        _expected_dict['commands'] = {
-            'off': _expected_dict['commands']['off'],
-            'cool': {
-                '18': _expected_values.expected_inc,
-                '19': _expected_values.expected_dec,
-                '20': _expected_values.expected_odd,
-            },
-            'heat': {
-                '18': _expected_values.expected_even,
-                '19': _expected_values.expected_lower,
-                '20': _expected_values.expected_upper,
-            },
-        }
-
-        with patch('broadlink.remote.rmmini.enter_learning'), patch(
-            'broadlink.device.Device.auth', Mock(return_value=True)
-        ), patch('time.sleep'), patch('builtins.input'), patch(
-            'broadlink.remote.rmmini.check_data',
-            Mock(
-                side_effect=cycle(
-                    [
-                        _expected_values.code_inc,
-                        _expected_values.code_dec,
-                        _expected_values.code_odd,
-                        _expected_values.code_even,
-                        _expected_values.code_lower,
-                        _expected_values.code_upper,
-                    ]
-                )
-            ),
-        ):
-            _a = SmartIrManager(json_file_good_data_op_mode, BroadlinkManager('0x51DA', '192.168.1.1', '12345678'))
-            assert _expect_dict_before_learn == _a.smartir_dict
-
-            _a.learn_all()
-            assert _expected_dict == _a.smartir_dict
-
-    def test_learning_op_fan_mode(self, json_file_good_data_op_fan_mode):
-        """Test dict generation, operationMode and fanMode only.
-
-        Arguments:
-            json_file_good_data_op_fan_mode: json file
-        """
-        _expected_values = ExpectedValues()
-        _expected_dict = dict_from_json(json_file_good_data_op_fan_mode)
-
-        _expect_dict_before_learn = dict(_expected_dict)
-        _expect_dict_before_learn['commands'] = {
-            'off': _expected_dict['commands']['off'],
-            'cool': {
-                'low': {
-                    '18': '',
-                    '19': '',
-                    '20': '',
-                },
-                'high': {
-                    '18': '',
-                    '19': '',
-                    '20': '',
-                },
-            },
-            'heat': {
-                'low': {
-                    '18': '',
-                    '19': '',
-                    '20': '',
-                },
-                'high': {
-                    '18': '',
-                    '19': '',
-                    '20': '',
-                },
-            },
-        }
-
-        _expected_dict['commands'] = {
-            'off': _expected_dict['commands']['off'],
-            'cool': {
-                'low': {
-                    '18': _expected_values.expected_inc,
-                    '19': _expected_values.expected_dec,
-                    '20': _expected_values.expected_odd,
-                },
-                'high': {
-                    '18': _expected_values.expected_even,
-                    '19': _expected_values.expected_lower,
-                    '20': _expected_values.expected_upper,
-                },
-            },
-            'heat': {
-                'low': {
-                    '18': _expected_values.expected_last,
-                    '19': _expected_values.expected_last_lower,
-                    '20': _expected_values.expected_inc,
-                },
-                'high': {
-                    '18': _expected_values.expected_dec,
-                    '19': _expected_values.expected_odd,
-                    '20': _expected_values.expected_even,
-                },
-            },
-        }
-
-        with patch('broadlink.remote.rmmini.enter_learning'), patch(
-            'broadlink.device.Device.auth', Mock(return_value=True)
-        ), patch('time.sleep'), patch('builtins.input'), patch(
-            'broadlink.remote.rmmini.check_data',
-            Mock(
-                side_effect=cycle(
-                    [
-                        _expected_values.code_inc,
-                        _expected_values.code_dec,
-                        _expected_values.code_odd,
-                        _expected_values.code_even,
-                        _expected_values.code_lower,
-                        _expected_values.code_upper,
-                        _expected_values.code_last,
-                        _expected_values.code_last_lower,
-                    ]
-                )
-            ),
-        ):
-            _a = SmartIrManager(json_file_good_data_op_fan_mode, BroadlinkManager('0x51DA', '192.168.1.1', '12345678'))
-            assert _expect_dict_before_learn == _a.smartir_dict
-
-            _a.learn_all()
-            assert _expected_dict == _a.smartir_dict
-
-    def test_learning_op_swing_mode(self, json_file_good_data_op_swing_mode):
-        """Test dict generation, operationMode and swingMode only.
+    @pytest.mark.parametrize(
+        'json_fixture, no_temp_on_mode, no_swing_on_mode, message',
+        [
+            ('json_file_not_broadlink', (), (), 'Controller .* not supported'),
+            ('json_file_not_base64', (), (), 'Encoding .* not supported'),
+            ('json_file_missing_min_temp', (), (), 'Missing mandatory field in json file: minTemperature'),
+            ('json_file_missing_max_temp', (), (), 'Missing mandatory field in json file: maxTemperature'),
+            ('json_file_missing_operation_modes', (), (), 'Missing mandatory field in json file: operationModes'),
+            ('json_file_good_data_op_fan_mode', (), ('heat',), 'Add swing to JSON file'),
+            ('json_file_good_data_op_fan_swing_mode', (), ('hesat',), 'no-swing-on-mode .*: hesat'),
+            ('json_file_good_data_op_fan_swing_mode', ('hesat',), (), 'no-temp-on-mode .*: hesat'),
+        ],
+    )
+    def test_usage_error(  # pylint: disable=too-many-arguments
+        self, request, json_fixture, no_temp_on_mode, no_swing_on_mode, message
+    ):
+        """Test json file content and no-*-on-mode parameters not supported.
 
         Arguments:
-            json_file_good_data_op_swing_mode: json file
+            request: pytest request, used to get json file fixture
+            json_fixture: name of json file fixture
+            no_temp_on_mode: operating modes without temperature
+            no_swing_on_mode: operating modes without swing
+            message: expected error message pattern
         """
-        _expected_values = ExpectedValues()
-        _expected_dict = dict_from_json(json_file_good_data_op_swing_mode)
-
-        _expect_dict_before_learn = dict(_expected_dict)
-        _expect_dict_before_learn['commands'] = {
-            'off': _expected_dict['commands']['off'],
-            'cool': {
-                'up': {
-                    '18': '',
-                    '19': '',
-                    '20': '',
-                },
-                'down': {
-                    '18': '',
-                    '19': '',
-                    '20': '',
-                },
-            },
-            'heat': {
-                'up': {
-                    '18': '',
-                    '19': '',
-                    '20': '',
-                },
-                'down': {
-                    '18': '',
-                    '19': '',
-                    '20': '',
-                },
-            },
-        }
-
-        _expected_dict['commands'] = {
-            'off': _expected_dict['commands']['off'],
-            'cool': {
-                'up': {
-                    '18': _expected_values.expected_inc,
-                    '19': _expected_values.expected_dec,
-                    '20': _expected_values.expected_odd,
-                },
-                'down': {
-                    '18': _expected_values.expected_even,
-                    '19': _expected_values.expected_lower,
-                    '20': _expected_values.expected_upper,
-                },
-            },
-            'heat': {
-                'up': {
-                    '18': _expected_values.expected_last,
-                    '19': _expected_values.expected_last_lower,
-                    '20': _expected_values.expected_inc,
-                },
-                'down': {
-                    '18': _expected_values.expected_dec,
-                    '19': _expected_values.expected_odd,
-                    '20': _expected_values.expected_even,
-                },
-            },
-        }
-
-        with patch('broadlink.remote.rmmini.enter_learning'), patch(
-            'broadlink.device.Device.auth', Mock(return_value=True)
-        ), patch('time.sleep'), patch('builtins.input'), patch(
-            'broadlink.remote.rmmini.check_data',
-            Mock(
-                side_effect=cycle(
-                    [
-                        _expected_values.code_inc,
-                        _expected_values.code_dec,
-                        _expected_values.code_odd,
-                        _expected_values.code_even,
-                        _expected_values.code_lower,
-                        _expected_values.code_upper,
-                        _expected_values.code_last,
-                        _expected_values.code_last_lower,
-                    ]
-                )
-            ),
-        ):
-            _a = SmartIrManager(
-                json_file_good_data_op_swing_mode, BroadlinkManager('0x51DA', '192.168.1.1', '12345678')
-            )
-            assert _expect_dict_before_learn == _a.smartir_dict
-
-            _a.learn_all()
-            assert _expected_dict == _a.smartir_dict
-
-    def test_learning_op_fan_swing_mode(self, json_file_good_data_op_fan_swing_mode):
-        """Test dict generation, all fields.
+        with pytest.raises(click.exceptions.UsageError, match=message):
+            _ = SmartIrManager(request.getfixturevalue(json_fixture), Mock(), no_temp_on_mode, no_swing_on_mode)
+
+    @pytest.mark.parametrize(
+        'json_fixture, levels',
+        [
+            ('json_file_good_data_op_mode', (_OP_MODES, _TEMPERATURES)),
+            ('json_file_good_data_op_fan_mode', (_OP_MODES, _FAN_MODES, _TEMPERATURES)),
+            ('json_file_good_data_op_swing_mode', (_OP_MODES, _SWING_MODES, _TEMPERATURES)),
+            ('json_file_good_data_op_fan_swing_mode', (_OP_MODES, _FAN_MODES, _SWING_MODES, _TEMPERATURES)),
+        ],
+    )
+    def test_learning(self, request, json_fixture, levels, broadlink_mng):
+        """Test dict generation, operationMode with or without fanMode and swingMode.
 
         Arguments:
-            json_file_good_data_op_fan_swing_mode: json file
+            request: pytest request, used to get json file fixture
+            json_fixture: name of json file fixture
+            levels: keys of each level of commands dict
+            broadlink_mng: Broadlink manager of this test
         """
-        _expected_values = ExpectedValues()
-        _expected_dict = dict_from_json(json_file_good_data_op_fan_swing_mode)
+        _json_file = request.getfixturevalue(json_fixture)
+        _json_dict = dict_from_json(_json_file)
+        _off = _json_dict['commands']['off']
 
-        _expect_dict_before_learn = dict(_expected_dict)
-        _expect_dict_before_learn['commands'] = {
-            'off': _expected_dict['commands']['off'],
-            'cool': {
-                'low': {
-                    'up': {
-                        '18': '',
-                        '19': '',
-                        '20': '',
-                    },
-                    'down': {
-                        '18': '',
-                        '19': '',
-                        '20': '',
-                    },
-                },
-                'high': {
-                    'up': {
-                        '18': '',
-                        '19': '',
-                        '20': '',
-                    },
-                    'down': {
-                        '18': '',
-                        '19': '',
-                        '20': '',
-                    },
-                },
-            },
-            'heat': {
-                'low': {
-                    'up': {
-                        '18': '',
-                        '19': '',
-                        '20': '',
-                    },
-                    'down': {
-                        '18': '',
-                        '19': '',
-                        '20': '',
-                    },
-                },
-                'high': {
-                    'up': {
-                        '18': '',
-                        '19': '',
-                        '20': '',
-                    },
-                    'down': {
-                        '18': '',
-                        '19': '',
-                        '20': '',
-                    },
-                },
-            },
-        }
-
-        _expected_dict['commands'] = {
-            'off': _expected_dict['commands']['off'],
-            'cool': {
-                'low': {
-                    'up': {
-                        '18': _expected_values.expected_inc,
-                        '19': _expected_values.expected_dec,
-                        '20': _expected_values.expected_odd,
-                    },
-                    'down': {
-                        '18': _expected_values.expected_even,
-                        '19': _expected_values.expected_lower,
-                        '20': _expected_values.expected_upper,
-                    },
-                },
-                'high': {
-                    'up': {
-                        '18': _expected_values.expected_last,
-                        '19': _expected_values.expected_last_lower,
-                        '20': _expected_values.expected_inc,
-                    },
-                    'down': {
-                        '18': _expected_values.expected_dec,
-                        '19': _expected_values.expected_odd,
-                        '20': _expected_values.expected_even,
-                    },
-                },
-            },
-            'heat': {
-                'low': {
-                    'up': {
-                        '18': _expected_values.expected_lower,
-                        '19': _expected_values.expected_upper,
-                        '20': _expected_values.expected_last,
-                    },
-                    'down': {
-                        '18': _expected_values.expected_last_lower,
-                        '19': _expected_values.expected_inc,
-                        '20': _expected_values.expected_dec,
-                    },
-                },
-                'high': {
-                    'up': {
-                        '18': _expected_values.expected_odd,
-                        '19': _expected_values.expected_even,
-                        '20': _expected_values.expected_lower,
-                    },
-                    'down': {
-                        '18': _expected_values.expected_upper,
-                        '19': _expected_values.expected_last,
-                        '20': _expected_values.expected_last_lower,
-                    },
-                },
-            },
-        }
+        # only commands differ from json file content
+        _expect_dict_before_learn = {**_json_dict, 'commands': {'off': _off, **_commands_tree(levels, repeat(''))}}
+        _expected_dict = {**_json_dict, 'commands': {'off': _off, **_commands_tree(levels, cycle(_EXPECTED_SEQ))}}
 
-        with patch('broadlink.remote.rmmini.enter_learning'), patch(
-            'broadlink.device.Device.auth', Mock(return_value=True)
-        ), patch('time.sleep'), patch('builtins.input'), patch(
-            'broadlink.remote.rmmini.check_data',
-            Mock(
-                side_effect=cycle(
-                    [
-                        _expected_values.code_inc,
-                        _expected_values.code_dec,
-                        _expected_values.code_odd,
-                        _expected_values.code_even,
-                        _expected_values.code_lower,
-                        _expected_values.code_upper,
-                        _expected_values.code_last,
-                        _expected_values.code_last_lower,
-                    ]
-                )
-            ),
-        ):
-            _a = SmartIrManager(
-                json_file_good_data_op_fan_swing_mode, BroadlinkManager('0x51DA', '192.168.1.1', '12345678')
-            )
-            assert _expect_dict_before_learn == _a.smartir_dict
+        _a = SmartIrManager(_json_file, broadlink_mng)
+        assert _expect_dict_before_learn == _a.smartir_dict
 
-            _a.learn_all()
-            assert _expected_dict == _a.smartir_dict
+        _a.learn_all()
+        assert _expected_dict == _a.smartir_dict
 
     def test_partial_op_fan_swing_mode(
-        self, json_file_partial_dict_op_fan_swing_mode, json_file_previous_partial_dict_op_fan_swing_mode
+        self, json_file_partial_dict_op_fan_swing_mode, json_file_previous_partial_dict_op_fan_swing_mode, broadlink_mng
     ):
         """Test dict generation, all fields.
 
         Arguments:
             json_file_partial_dict_op_fan_swing_mode: json file
             json_file_previous_partial_dict_op_fan_swing_mode: json file with partial IR saved
+            broadlink_mng: Broadlink manager of this test
         """
-        _expected_values = ExpectedValues()
-        _expected_dict = dict_from_json(json_file_previous_partial_dict_op_fan_swing_mode)
         _source_dict = dict_from_json(json_file_partial_dict_op_fan_swing_mode)
+        _expected_dict = {
+            **dict_from_json(json_file_previous_partial_dict_op_fan_swing_mode),
+            'off': _source_dict['commands']['off'],
+        }
 
-        _expected_dict.update({'off': _source_dict['commands']['off']})
-
-        with patch('broadlink.remote.rmmini.enter_learning'), patch(
-            'broadlink.device.Device.auth', Mock(return_value=True)
-        ), patch('time.sleep'), patch('builtins.input'), patch(
-            'broadlink.remote.rmmini.check_data',
-            Mock(
-                side_effect=cycle(
-                    [
-                        _expected_values.code_inc,
-                        _expected_values.code_dec,
-                        _expected_values.code_odd,
-                        _expected_values.code_even,
-                        _expected_values.code_lower,
-                        _expected_values.code_upper,
-                        _expected_values.code_last,
-                        _expected_values.code_last_lower,
-                    ]
-                )
-            ),
-        ):
-            _a = SmartIrManager(
-                json_file_partial_dict_op_fan_swing_mode, BroadlinkManager('0x51DA', '192.168.1.1', '12345678')
-            )
-            assert _a.smartir_dict['commands'] == _expected_dict
-            assert _a.partial_inc == 3
+        _a = SmartIrManager(json_file_partial_dict_op_fan_swing_mode, broadlink_mng)
+        assert _a.smartir_dict['commands'] == _expected_dict
+        assert _a.partial_inc == 3
 
     def test_partial_op_swing_mode_multiple_files(
-        self, json_file_partial_dict_op_swing_mode, json_file_last_previous_partial_dict_op_swing_mode
+        self, json_file_partial_dict_op_swing_mode, json_file_last_previous_partial_dict_op_swing_mode, broadlink_mng
     ):
         """Test dict generation, all fields.
 
         Arguments:
             json_file_partial_dict_op_swing_mode: json file
             json_file_last_previous_partial_dict_op_swing_mode: last json file with partial IR saved
+            broadlink_mng: Broadlink manager of this test
         """
-        _expected_values = ExpectedValues()
-        _expected_dict = dict_from_json(json_file_last_previous_partial_dict_op_swing_mode)
         _source_dict = dict_from_json(json_file_partial_dict_op_swing_mode)
+        _expected_dict = {
+            **dict_from_json(json_file_last_previous_partial_dict_op_swing_mode),
+            'off': _source_dict['commands']['off'],
+        }
 
-        _expected_dict.update({'off': _source_dict['commands']['off']})
-
-        with patch('broadlink.remote.rmmini.enter_learning'), patch(
-            'broadlink.device.Device.auth', Mock(return_value=True)
-        ), patch('time.sleep'), patch('builtins.input'), patch(
-            'broadlink.remote.rmmini.check_data',
-            Mock(
-                side_effect=cycle(
-                    [
-                        _expected_values.code_inc,
-                        _expected_values.code_dec,
-                        _expected_values.code_odd,
-                        _expected_values.code_even,
-                        _expected_values.code_lower,
-                        _expected_values.code_upper,
-                        _expected_values.code_last,
-                        _expected_values.code_last_lower,
-                    ]
-                )
-            ),
-        ):
-            _a = SmartIrManager(
-                json_file_partial_dict_op_swing_mode, BroadlinkManager('0x51DA', '192.168.1.1', '12345678')
-            )
-            assert _a.smartir_dict['commands'] == _expected_dict
-            assert _a.partial_inc == 3
+        _a = SmartIrManager(json_file_partial_dict_op_swing_mode, broadlink_mng)
+        assert _a.smartir_dict['commands'] == _expected_dict
+        assert _a.partial_inc == 3
 
-    def test_skip_temp(self, json_file_good_data_op_fan_swing_mode):
+    def test_skip_temp(self, json_file_good_data_op_fan_swing_mode, broadlink_mng):
         """Test dict generation, all fields.
 
         Arguments:
             json_file_good_data_op_fan_swing_mode: json file
+            broadlink_mng: Broadlink manager of this test
         """
-        _expected_values = ExpectedValues()
-        _expected_dict = dict_from_json(json_file_good_data_op_fan_swing_mode)
+        _json_dict = dict_from_json(json_file_good_data_op_fan_swing_mode)
 
+        _expected_dict = dict(_json_dict)
         _expected_dict['commands'] = {
-            'off': _expected_dict['commands']['off'],
+            'off': _json_dict['commands']['off'],
             'cool': {
                 'low': {
                     'up': {
-                        '18': _expected_values.expected_inc,
-                        '19': _expected_values.expected_dec,
-                        '20': _expected_values.expected_odd,
+                        '18': _EV.expected_inc,
+                        '19': _EV.expected_dec,
+                        '20': _EV.expected_odd,
                     },
                     'down': {
-                        '18': _expected_values.expected_even,
-                        '19': _expected_values.expected_lower,
-                        '20': _expected_values.expected_upper,
+                        '18': _EV.expected_even,
+                        '19': _EV.expected_lower,
+                        '20': _EV.expected_upper,
                     },
                 },
                 'high': {
                     'up': {
-                        '18': _expected_values.expected_last,
-                        '19': _expected_values.expected_last_lower,
-                        '20': _expected_values.expected_inc,
+                        '18': _EV.expected_last,
+                        '19': _EV.expected_last_lower,
+                        '20': _EV.expected_inc,
                     },
                     'down': {
-                        '18': _expected_values.expected_dec,
-                        '19': _expected_values.expected_odd,
-                        '20': _expected_values.expected_even,
+                        '18': _EV.expected_dec,
+                        '19': _EV.expected_odd,
+                        '20': _EV.expected_even,
                     },
                 },
             },
             'heat': {
                 'low': {
                     'up': {
-                        '18': _expected_values.expected_lower,
-                        '19': _expected_values.expected_lower,
-                        '20': _expected_values.expected_lower,
+                        '18': _EV.expected_lower,
+                        '19': _EV.expected_lower,
+                        '20': _EV.expected_lower,
                     },
                     'down': {
-                        '18': _expected_values.expected_upper,
-                        '19': _expected_values.expected_upper,
-                        '20': _expected_values.expected_upper,
+                        '18': _EV.expected_upper,
+                        '19': _EV.expected_upper,
+                        '20': _EV.expected_upper,
                     },
                 },
                 'high': {
                     'up': {
-                        '18': _expected_values.expected_last,
-                        '19': _expected_values.expected_last,
-                        '20': _expected_values.expected_last,
+                        '18': _EV.expected_last,
+                        '19': _EV.expected_last,
+                        '20': _EV.expected_last,
                     },
                     'down': {
-                        '18': _expected_values.expected_last_lower,
-                        '19': _expected_values.expected_last_lower,
-                        '20': _expected_values.expected_last_lower,
+                        '18': _EV.expected_last_lower,
+                        '19': _EV.expected_last_lower,
+                        '20': _EV.expected_last_lower,
                     },
                 },
             },
         }
 
-        with patch('broadlink.remote.rmmini.enter_learning'), patch(
-            'broadlink.device.Device.auth', Mock(return_value=True)
-        ), patch('time.sleep'), patch('builtins.input'), patch(
-            'broadlink.remote.rmmini.check_data',
-            Mock(
-                side_effect=cycle(
-                    [
-                        _expected_values.code_inc,
-                        _expected_values.code_dec,
-                        _expected_values.code_odd,
-                        _expected_values.code_even,
-                        _expected_values.code_lower,
-                        _expected_values.code_upper,
-                        _expected_values.code_last,
-                        _expected_values.code_last_lower,
-                    ]
-                )
-            ),
-        ):
-            _a = SmartIrManager(
-                json_file_good_data_op_fan_swing_mode, BroadlinkManager('0x51DA', '192.168.1.1', '12345678'), ('heat',)
-            )
+        _a = SmartIrManager(json_file_good_data_op_fan_swing_mode, broadlink_mng, ('heat',))
 
-            _a.learn_all()
-            assert _expected_dict == _a.smartir_dict
+        _a.learn_all()
+        assert _expected_dict == _a.smartir_dict
 
-    def test_skip_swing(self, json_file_good_data_op_fan_swing_mode):
+    def test_skip_swing(self, json_file_good_data_op_fan_swing_mode, broadlink_mng):
         """Test dict generation, all fields.
 
         Arguments:
             json_file_good_data_op_fan_swing_mode: json file
+            broadlink_mng: Broadlink manager of this test
         """
-        _expected_values = ExpectedValues()
-        _expected_dict = dict_from_json(json_file_good_data_op_fan_swing_mode)
+        _json_dict = dict_from_json(json_file_good_data_op_fan_swing_mode)
 
+        _expected_dict = dict(_json_dict)
         _expected_dict['commands'] = {
-            'off': _expected_dict['commands']['off'],
+            'off': _json_dict['commands']['off'],
             'cool': {
                 'low': {
                     'up': {
-                        '18': _expected_values.expected_inc,
-                        '19': _expected_values.expected_dec,
-                        '20': _expected_values.expected_odd,
+                        '18': _EV.expected_inc,
+                        '19': _EV.expected_dec,
+                        '20': _EV.expected_odd,
                     },
                     'down': {
-                        '18': _expected_values.expected_even,
-                        '19': _expected_values.expected_lower,
-                        '20': _expected_values.expected_upper,
+                        '18': _EV.expected_even,
+                        '19': _EV.expected_lower,
+                        '20': _EV.expected_upper,
                     },
                 },
                 'high': {
                     'up': {
-                        '18': _expected_values.expected_last,
-                        '19': _expected_values.expected_last_lower,
-                        '20': _expected_values.expected_inc,
+                        '18': _EV.expected_last,
+                        '19': _EV.expected_last_lower,
+                        '20': _EV.expected_inc,
                     },
                     'down': {
-                        '18': _expected_values.expected_dec,
-                        '19': _expected_values.expected_odd,
-                        '20': _expected_values.expected_even,
+                        '18': _EV.expected_dec,
+                        '19': _EV.expected_odd,
+                        '20': _EV.expected_even,
                     },
                 },
             },
             'heat': {
                 'low': {
                     'up': {
-                        '18': _expected_values.expected_lower,
-                        '19': _expected_values.expected_upper,
-                        '20': _expected_values.expected_last,
+                        '18': _EV.expected_lower,
+                        '19': _EV.expected_upper,
+                        '20': _EV.expected_last,
                     },
                     'down': {
-                        '18': _expected_values.expected_lower,
-                        '19': _expected_values.expected_upper,
-                        '20': _expected_values.expected_last,
+                        '18': _EV.expected_lower,
+                        '19': _EV.expected_upper,
+                        '20': _EV.expected_last,
                     },
                 },
                 'high': {
                     'up': {
-                        '18': _expected_values.expected_last_lower,
-                        '19': _expected_values.expected_inc,
-                        '20': _expected_values.expected_dec,
+                        '18': _EV.expected_last_lower,
+                        '19': _EV.expected_inc,
+                        '20': _EV.expected_dec,
                     },
                     'down': {
-                        '18': _expected_values.expected_last_lower,
-                        '19': _expected_values.expected_inc,
-                        '20': _expected_values.expected_dec,
+                        '18': _EV.expected_last_lower,
+                        '19': _EV.expected_inc,
+                        '20': _EV.expected_dec,
                     },
                 },
             },
         }
 
-        with patch('broadlink.remote.rmmini.enter_learning'), patch(
-            'broadlink.device.Device.auth', Mock(return_value=True)
-        ), patch('time.sleep'), patch('builtins.input'), patch(
-            'broadlink.remote.rmmini.check_data',
-            Mock(
-                side_effect=cycle(
-                    [
-                        _expected_values.code_inc,
-                        _expected_values.code_dec,
-                        _expected_values.code_odd,
-                        _expected_values.code_even,
-                        _expected_values.code_lower,
-                        _expected_values.code_upper,
-                        _expected_values.code_last,
-                        _expected_values.code_last_lower,
-                    ]
-                )
-            ),
-        ):
-            _a = SmartIrManager(
-                json_file_good_data_op_fan_swing_mode,
-                BroadlinkManager('0x51DA', '192.168.1.1', '12345678'),
-                (),
-                ('heat',),
-            )
+        _a = SmartIrManager(
+            json_file_good_data_op_fan_swing_mode,
+            broadlink_mng,
+            (),
+            ('heat',),
+        )
 
-            _a.learn_all()
-            assert _expected_dict == _a.smartir_dict
+        _a.learn_all()
+        assert _expected_dict == _a.smartir_dict
 
-    def test_skip_swing_no_fan_mode(self, json_file_good_data_op_swing_mode):
+    def test_skip_swing_no_fan_mode(self, json_file_good_data_op_swing_mode, broadlink_mng):
         """Test dict generation, all fields.
 
         Arguments:
             json_file_good_data_op_swing_mode: json file
+            broadlink_mng: Broadlink manager of this test
         """
-        _expected_values = ExpectedValues()
-        _expected_dict = dict_from_json(json_file_good_data_op_swing_mode)
+        _json_dict = dict_from_json(json_file_good_data_op_swing_mode)
 
+        _expected_dict = dict(_json_dict)
         _expected_dict['commands'] = {
-            'off': _expected_dict['commands']['off'],
+            'off': _json_dict['commands']['off'],
             'cool': {
                 'up': {
-                    '18': _expected_values.expected_inc,
-                    '19': _expected_values.expected_dec,
-                    '20': _expected_values.expected_odd,
+                    '18': _EV.expected_inc,
+                    '19': _EV.expected_dec,
+                    '20': _EV.expected_odd,
                 },
                 'down': {
-                    '18': _expected_values.expected_even,
-                    '19': _expected_values.expected_lower,
-                    '20': _expected_values.expected_upper,
+                    '18': _EV.expected_even,
+                    '19': _EV.expected_lower,
+                    '20': _EV.expected_upper,
                 },
             },
             'heat': {
                 'up': {
-                    '18': _expected_values.expected_last,
-                    '19': _expected_values.expected_last_lower,
-                    '20': _expected_values.expected_inc,
+                    '18': _EV.expected_last,
+                    '19': _EV.expected_last_lower,
+                    '20': _EV.expected_inc,
                 },
                 'down': {
-                    '18': _expected_values.expected_last,
-                    '19': _expected_values.expected_last_lower,
-                    '20': _expected_values.expected_inc,
+                    '18': _EV.expected_last,
+                    '19': _EV.expected_last_lower,
+                    '20': _EV.expected_inc,
                 },
             },
         }
 
-        with patch('broadlink.remote.rmmini.enter_learning'), patch(
-            'broadlink.device.Device.auth', Mock(return_value=True)
-        ), patch('time.sleep'), patch('builtins.input'), patch(
-            'broadlink.remote.rmmini.check_data',
-            Mock(
-                side_effect=cycle(
-                    [
-                        _expected_values.code_inc,
-                        _expected_values.code_dec,
-                        _expected_values.code_odd,
-                        _expected_values.code_even,
-                        _expected_values.code_lower,
-                        _expected_values.code_upper,
-                        _expected_values.code_last,
-                        _expected_values.code_last_lower,
-                    ]
-                )
-            ),
-        ):
-            _a = SmartIrManager(
-                json_file_good_data_op_swing_mode,
-                BroadlinkManager('0x51DA', '192.168.1.1', '12345678'),
-                (),
-                ('heat',),
-            )
+        _a = SmartIrManager(
+            json_file_good_data_op_swing_mode,
+            broadlink_mng,
+            (),
+            ('heat',),
+        )
 
-            _a.learn_all()
-            assert _expected_dict == _a.smartir_dict
+        _a.learn_all()
+        assert _expected_dict == _a.smartir_dict
 
-    def test_skip_swing_cli_param(self, json_file_good_data_op_fan_mode):
-        """Test dict generation, all fields.
-
-        Arguments:
-            json_file_good_data_op_fan_mode: json file without swing
-        """
-        with patch('broadlink.device.Device.auth', Mock(return_value=True)):
-            with pytest.raises(click.exceptions.UsageError):
-                _ = SmartIrManager(
-                    json_file_good_data_op_fan_mode,
-                    BroadlinkManager('0x51DA', '192.168.1.1', '12345678'),
-                    (),
-                    ('heat',),
-                )
-
-    def test_mode_not_present_from_swing(self, json_file_good_data_op_fan_swing_mode):
-        """Test dict generation, all fields.
+    def test_skip_temp_and_swing(self, json_file_good_data_op_fan_swing_mode, monkeypatch, broadlink_mng):
+        """Test dict generation, operating mode without temperature and swing is learnt once per fan.
 
         Arguments:
             json_file_good_data_op_fan_swing_mode: json file
+            monkeypatch: pytest fixture to count device check_data calls
+            broadlink_mng: Broadlink manager of this test
         """
-        with patch('broadlink.device.Device.auth', Mock(return_value=True)):
-            with pytest.raises(click.exceptions.UsageError):
-                _ = SmartIrManager(
-                    json_file_good_data_op_fan_swing_mode,
-                    BroadlinkManager('0x51DA', '192.168.1.1', '12345678'),
-                    (),
-                    ('hesat',),
-                )
-
-    def test_mode_not_present_from_temp(self, json_file_good_data_op_fan_swing_mode):
-        """Test dict generation, all fields.
-
-        Arguments:
-            json_file_good_data_op_fan_swing_mode: json file
-        """
-        with patch('broadlink.device.Device.auth', Mock(return_value=True)):
-            with pytest.raises(click.exceptions.UsageError):
-                _ = SmartIrManager(
-                    json_file_good_data_op_fan_swing_mode,
-                    BroadlinkManager('0x51DA', '192.168.1.1', '12345678'),
-                    ('hesat',),
-                    (),
-                )
-
-    def test_no_code(self, json_file_good_data_op_mode):
+        _check_data = Mock(side_effect=cycle([_EV.code_inc, _EV.code_dec]))
+
+        monkeypatch.setattr('broadlink.remote.rmmini.check_data', _check_data)
+        _a = SmartIrManager(
+            json_file_good_data_op_fan_swing_mode,
+            broadlink_mng,
+            ('heat',),
+            ('heat',),
+        )
+
+        _a.learn_all()
+        # cool: 2 fan * 2 swing * 3 temperature, heat: 2 fan
+        assert _check_data.call_count == 14
+        for _fan in ('low', 'high'):
+            _codes = {_c for _swing in _a.smartir_dict['commands']['heat'][_fan].values() for _c in _swing.values()}
+            assert len(_codes) == 1
+
+    def test_no_code(self, json_file_good_data_op_mode, broadlink_mng):
         """Test dict generation, operationMode only.
 
         Arguments:
             json_file_good_data_op_mode: json file
+            broadlink_mng: Broadlink manager of this test
         """
-        with patch('broadlink.remote.rmmini.enter_learning'), patch(
-            'broadlink.device.Device.auth', Mock(return_value=True)
-        ), patch('time.sleep'), patch('builtins.input'), patch(
+        with patch(
             'broadlink_listener.cli_tools.broadlink_manager.BroadlinkManager.learn_single_code', Mock(return_value=None)
         ):
             with pytest.raises(click.exceptions.UsageError):
-                _a = SmartIrManager(json_file_good_data_op_mode, BroadlinkManager('0x51DA', '192.168.1.1', '12345678'))
+                _a = SmartIrManager(json_file_good_data_op_mode, broadlink_mng)
                 _a.learn_all()
 
             with pytest.raises(click.exceptions.UsageError):
-                _a = SmartIrManager(json_file_good_data_op_mode, BroadlinkManager('0x51DA', '192.168.1.1', '12345678'))
+                _a = SmartIrManager(json_file_good_data_op_mode, broadlink_mng)
                 _a.learn_off()
 
+    def test_save_partial_without_off(self, json_file_good_data_op_mode, monkeypatch, broadlink_mng):
+        """Test partial dict is saved without off command, leaving learnt dict untouched.
+
+        Arguments:
+            json_file_good_data_op_mode: json file
+            monkeypatch: pytest fixture to patch device check_data
+            broadlink_mng: Broadlink manager of this test
+        """
+        monkeypatch.setattr('broadlink.remote.rmmini.check_data', Mock(return_value=_EV.code_inc))
+        _a = SmartIrManager(json_file_good_data_op_mode, broadlink_mng)
+        _a.learn_off()
+        _a._save_partial_dict()  # pylint: disable=protected-access
+
+        _partial = dict_from_json(json_file_good_data_op_mode.parent.joinpath('good_data_op_mode_tmp_000.json'))
+        assert 'off' not in _partial
+        assert _partial['cool'] == _a.smartir_dict['commands']['cool']
+        assert _a.smartir_dict['commands']['off'] == _EV.expected_inc
+        assert _a.partial_inc == 1
+
     @freeze_time("2023-02-10 12:10:30")
-    def test_handle_signal(self, json_file_good_data_op_fan_swing_mode, capsys):
+    def test_handle_signal(self, json_file_good_data_op_fan_swing_mode, capsys, broadlink_mng):
         """Test handle keyboard interrupt.
 
         Arguments:
             json_file_good_data_op_fan_swing_mode: json file
             capsys: pytest mock to capture stdout
+            broadlink_mng: Broadlink manager of this test
         """
-        with patch('broadlink.remote.rmmini.enter_learning'), patch(
-            'broadlink.device.Device.auth', Mock(return_value=True)
-        ), patch('time.sleep'), patch('builtins.input'):
-            _a = SmartIrManager(
-                json_file_good_data_op_fan_swing_mode, BroadlinkManager('0x51DA', '192.168.1.1', '12345678')
-            )
-            _a.save_dict()
-
-            captured = capsys.readouterr()
-            assert 'good_data_op_fan_swing_mode_20230210_121030.json' in captured.out
+        _a = SmartIrManager(json_file_good_data_op_fan_swing_mode, broadlink_mng)
+        _a.save_dict()
+
+        captured = capsys.readouterr()
+        assert 'good_data_op_fan_swing_mode_20230210_121030.json' in captured.out
@@ -6,9 +6,36 @@
 
 import logging
 import socket
+from typing import Generator
 from unittest.mock import Mock, patch
 
-from broadlink_listener.cli_tools.utils import configure_logger, get_local_ip_address
+import pytest
+
+from broadlink_listener.cli_tools import utils
+from broadlink_listener.cli_tools.utils import configure_logger, get_local_ip_address, load_json, save_json
+
+_FMT = '%(asctime)s [%(levelname)s - %(filename)s:%(lineno)d]    %(message)s'
+
+# nested dicts, empty values and non-ascii text, to compare the encoders
+_JSON_CONTENT = {
+    'manufacturer': 'Daikin',
+    'supportedModels': ['FTXM20M', 'ATXM20MÜ'],
+    'commands': {'off': 'MTIzNDU2Nzg=', 'cool': {'18': '', '19': None}, 'heat': {}},
+    'minTemperature': 18,
+    'precision': 0.5,
+}
+
+
+@pytest.fixture(autouse=True)
+def _clear_ip_cache() -> Generator:
+    """Detect local IP address again in each test, a patched address never leaks into later tests.
+
+    Yields:
+        nothing, cache is cleared before and after the test
+    """
+    get_local_ip_address.cache_clear()
+    yield
+    get_local_ip_address.cache_clear()
 
 
 @patch('logging.basicConfig')
@@ -19,33 +46,16 @@ def test_logger(patched_log):
         patched_log: patched basicConfig method
     """
     configure_logger()
-    patched_log.assert_called_with(
-        level=logging.INFO, format='%(asctime)s [%(levelname)s - %(filename)s:%(lineno)d]    %(message)s', handlers=None
-    )
-
-    configure_logger('info')
-    patched_log.assert_called_with(
-        level=logging.INFO, format='%(asctime)s [%(levelname)s - %(filename)s:%(lineno)d]    %(message)s', handlers=None
-    )
-
-    configure_logger('debug')
-    patched_log.assert_called_with(
-        level=logging.DEBUG,
-        format='%(asctime)s [%(levelname)s - %(filename)s:%(lineno)d]    %(message)s',
-        handlers=None,
-    )
-
-    configure_logger('warning')
-    patched_log.assert_called_with(
-        level=logging.WARN, format='%(asctime)s [%(levelname)s - %(filename)s:%(lineno)d]    %(message)s', handlers=None
-    )
-
-    configure_logger('error')
-    patched_log.assert_called_with(
-        level=logging.ERROR,
-        format='%(asctime)s [%(levelname)s - %(filename)s:%(lineno)d]    %(message)s',
-        handlers=None,
-    )
+    patched_log.assert_called_with(level=logging.INFO, format=_FMT, handlers=None)
+
+    for _arg, _level in (
+        ('info', logging.INFO),
+        ('debug', logging.DEBUG),
+        ('warning', logging.WARN),
+        ('error', logging.ERROR),
+    ):
+        configure_logger(_arg)
+        patched_log.assert_called_with(level=_level, format=_FMT, handlers=None)
 
 
 @patch('socket.socket.getsockname', Mock(side_effect=TimeoutError()))
@@ -60,9 +70,57 @@ def test_get_ip_real_ip_patched():
     assert get_local_ip_address() == '192.168.1.150'
 
 
+def test_get_ip_cached():
+    """Testing get_local_ip_address opens the socket only once."""
+    with patch('socket.socket.getsockname', Mock(return_value=['192.168.1.150'])) as _getsockname:
+        assert get_local_ip_address() == '192.168.1.150'
+        assert get_local_ip_address() == '192.168.1.150'
+    assert _getsockname.call_count == 1
+
+
 def test_get_ip_real_ip():
     """Testing get_local_ip_address with real mocked address."""
     with patch('socket.socket.connect'), patch('socket.socket'), patch(
         'socket.socket.getsockname', Mock(return_value='192.168.1.150')
     ):
         assert socket.socket.getsockname() == '192.168.1.150'
+
+
+@pytest.mark.parametrize(
+    'use_orjson',
+    [pytest.param(True, marks=pytest.mark.skipif(utils.orjson is None, reason='no orjson')), False],
+)
+def test_json_round_trip(tmp_path, monkeypatch, use_orjson):
+    """Testing save_json and load_json, with and without orjson.
+
+    Arguments:
+        tmp_path: pytest temporary directory
+        monkeypatch: pytest monkeypatch fixture
+        use_orjson: keep orjson encoder, otherwise use stdlib one
+    """
+    if not use_orjson:
+        monkeypatch.setattr(utils, 'orjson', None)
+    save_json(tmp_path.joinpath('compact.json'), _JSON_CONTENT)
+    save_json(tmp_path.joinpath('indented.json'), _JSON_CONTENT, indent=True)
+
+    assert load_json(tmp_path.joinpath('compact.json')) == _JSON_CONTENT
+    assert load_json(tmp_path.joinpath('indented.json')) == _JSON_CONTENT
+    assert '\n  "commands"' in tmp_path.joinpath('indented.json').read_text(encoding='utf-8')
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+@pytest.mark.skipif(utils.orjson is None, reason='no orjson')
+@pytest.mark.parametrize('indent', [False, True])
+def test_json_encoders_equivalent(tmp_path, monkeypatch, indent):
+    """Testing orjson and stdlib json fallback write the same file.
+
+    Arguments:
+        tmp_path: pytest temporary directory
+        monkeypatch: pytest monkeypatch fixture
+        indent: indent output with two spaces
+    """
+    save_json(tmp_path.joinpath('orjson.json'), _JSON_CONTENT, indent=indent)
+    monkeypatch.setattr(utils, 'orjson', None)
+    save_json(tmp_path.joinpath('json.json'), _JSON_CONTENT, indent=indent)
+
+    assert tmp_path.joinpath('orjson.json').read_bytes() == tmp_path.joinpath('json.json').read_bytes()